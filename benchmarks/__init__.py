@@ -0,0 +1,11 @@
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+def use_src(src_dir=SRC_DIR):
+    # The generator's modules import each other as top-level names, the same
+    # way src/main.py runs them, so benchmarks put src/ on the path first.
+    src_dir = os.path.abspath(src_dir)
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
\ No newline at end of file
@@ -0,0 +1,46 @@
+import argparse
+import json
+import sys
+from benchmarks.run import STAGES
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(baseline, current, threshold):
+    rows = []
+    regressions = []
+    for stage in STAGES:
+        before = baseline["stages"].get(stage)
+        after = current["stages"].get(stage)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((stage, before, after, change))
+        if change > threshold:
+            regressions.append(stage)
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail when a benchmark stage regresses against a stored baseline.")
+    parser.add_argument("baseline", help="JSON written by benchmarks.run --out")
+    parser.add_argument("current", help="JSON written by benchmarks.run --out")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown per stage, in percent")
+    args = parser.parse_args(argv)
+    
+    baseline = load(args.baseline)
+    current = load(args.current)
+    if baseline["meta"]["pages"] != current["meta"]["pages"] or baseline["meta"]["shape"] != current["meta"]["shape"]:
+        print("warning: baseline and current runs used different corpora", file=sys.stderr)
+    
+    rows, regressions = compare(baseline, current, args.threshold)
+    for stage, before, after, change in rows:
+        flag = "  REGRESSION" if stage in regressions else ""
+        print(f"{stage:20} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms {change:+7.1f}%{flag}")
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the {args.threshold:g}% threshold: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,94 @@
+import argparse
+import os
+import random
+
+SHAPES = ("paragraph", "link", "list", "code", "mixed")
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+WORDS = (
+    "elf hobbit ring wizard mountain river forest shadow light road tower king "
+    "sword song star ship gate hall lore map tale age dwarf horse bridge"
+).split()
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def inline(rng, links=1):
+    parts = [sentence(rng, 6), f"**{rng.choice(WORDS)}**", sentence(rng, 4), f"_{rng.choice(WORDS)}_"]
+    for _ in range(links):
+        parts.append(f"[{rng.choice(WORDS)} {rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})")
+    parts.append(f"`{rng.choice(WORDS)}()`")
+    return " ".join(parts)
+
+def paragraph_block(rng):
+    return "\n".join(inline(rng, 0) for _ in range(3))
+
+def link_block(rng):
+    return " ".join(inline(rng, 4) for _ in range(2)) + f" ![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)"
+
+def list_block(rng):
+    items = [f"- {inline(rng, 1)}" for _ in range(6)]
+    items += [f"{i}. {sentence(rng, 5)}" for i in range(1, 4)]
+    return "\n".join(items[:6]) + "\n\n" + "\n".join(items[6:])
+
+def code_block(rng):
+    lines = [f"print(\"{rng.choice(WORDS)}\")" for _ in range(12)]
+    return "```\n" + "\n".join(lines) + "\n```"
+
+BLOCKS = {
+    "paragraph": paragraph_block,
+    "link": link_block,
+    "list": list_block,
+    "code": code_block,
+}
+
+def page(rng, shape, blocks):
+    parts = [f"# {sentence(rng, 5)}", f"> {sentence(rng)}"]
+    for i in range(blocks):
+        kind = rng.choice(tuple(BLOCKS)) if shape == "mixed" else shape
+        if i % 8 == 0:
+            parts.append(f"## {sentence(rng, 4)}")
+        parts.append(BLOCKS[kind](rng))
+    return "\n\n".join(parts) + "\n"
+
+def generate_corpus(root, pages, shape="mixed", blocks=20, seed=0):
+    if shape not in SHAPES:
+        raise ValueError(f"unknown corpus shape {shape!r}, expected one of {', '.join(SHAPES)}")
+    rng = random.Random(seed)
+    content = os.path.join(root, "content")
+    for i in range(pages):
+        # Spread pages over nested directories the way a real blog grows.
+        directory = os.path.join(content, "blog", f"{i // 1000:03d}", f"post-{i}")
+        if i == 0:
+            directory = content
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "index.md"), "w", encoding="utf-8") as f:
+            f.write(page(rng, shape, blocks))
+    with open(os.path.join(root, "template.html"), "w", encoding="utf-8") as f:
+        f.write(TEMPLATE)
+    return content, os.path.join(root, "template.html")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic site for benchmarking.")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--shape", choices=SHAPES, default="mixed")
+    parser.add_argument("--blocks", type=int, default=20, help="blocks per page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_corpus(args.root, args.pages, args.shape, args.blocks, args.seed)
+    print(f"Wrote {args.pages} {args.shape} pages under {args.root}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import argparse
+import os
+import subprocess
+import sys
+from benchmarks import SRC_DIR, use_src
+
+def build_document(paragraphs):
+    parts = ["# Memory benchmark"]
+    for i in range(paragraphs):
+        parts.append(f"## Section {i}")
+        parts.append(
+            f"Paragraph {i} has **bold**, _italic_ and `code` text with a "
+            f"[link number {i}](/posts/{i}) and ![image {i}](/images/{i}.png) inside."
+        )
+        parts.append(f"- item [one](/a/{i})\n- item **two**\n- item _three_")
+    return "\n\n".join(parts)
+
+def child(src_dir, paragraphs):
+    import resource
+    use_src(src_dir)
+    from markdown_blocks import markdown_to_html_node
+    markdown = build_document(paragraphs)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    node = markdown_to_html_node(markdown)
+    tree = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    html = node.to_html()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{base} {tree} {peak} {len(html)}")
+
+def measure(src_dir, paragraphs):
+    # A fresh interpreter per run keeps each peak-RSS reading independent.
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "--child", src_dir, "--paragraphs", str(paragraphs)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    base, tree, peak, size = (int(x) for x in out)
+    return base, tree, peak, size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak RSS while rendering one large markdown document.")
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--src", default=SRC_DIR, help="source tree to measure")
+    parser.add_argument("--compare", metavar="SRC", help="also measure another source tree, e.g. an older checkout")
+    parser.add_argument("--child", metavar="SRC", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(args.child, args.paragraphs)
+        return
+    
+    runs = [("current", args.src)]
+    if args.compare:
+        runs.insert(0, ("compare", args.compare))
+    for label, src_dir in runs:
+        base, tree, peak, size = measure(os.path.abspath(src_dir), args.paragraphs)
+        print(
+            f"{label:8} {src_dir}: node tree +{(tree - base) / 1024:.1f} MiB, "
+            f"peak RSS {peak / 1024:.1f} MiB after serializing {size} bytes of HTML"
+        )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from benchmarks import SRC_DIR, use_src
+from benchmarks.corpus import SHAPES, generate_corpus
+
+STAGES = ("markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "to_html", "build")
+
+def read_pages(content):
+    pages = []
+    for root, dirs, names in os.walk(content):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(".md"):
+                with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                    pages.append(f.read())
+    return pages
+
+def inline_texts(blocks, block_to_block_type, BlockType):
+    texts = []
+    for block in blocks:
+        if block_to_block_type(block) == BlockType.CODE:
+            continue
+        for line in block.splitlines():
+            text = line.lstrip("#>-0123456789. ").strip()
+            if text:
+                texts.append(text)
+    return texts
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(pages=100, shape="mixed", blocks=20, repeat=3, src_dir=SRC_DIR):
+    use_src(src_dir)
+    from markdown_blocks import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node, generate_pages_recursive
+    from split_nodes_delimiter import text_to_textnodes
+    
+    with tempfile.TemporaryDirectory() as root:
+        content, template = generate_corpus(root, pages, shape, blocks)
+        docs = read_pages(content)
+        all_blocks = [block for md in docs for block in markdown_to_blocks(md)]
+        texts = inline_texts(all_blocks, block_to_block_type, BlockType)
+        nodes = [markdown_to_html_node(md) for md in docs]
+        
+        def build():
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive("/", content, template, os.path.join(root, "docs"))
+        
+        timings = {
+            "markdown_to_blocks": best_of(repeat, lambda: [markdown_to_blocks(md) for md in docs]),
+            "block_to_block_type": best_of(repeat, lambda: [block_to_block_type(b) for b in all_blocks]),
+            "text_to_textnodes": best_of(repeat, lambda: [text_to_textnodes(t) for t in texts]),
+            "to_html": best_of(repeat, lambda: [node.to_html() for node in nodes]),
+            "build": best_of(repeat, build),
+        }
+    return {
+        "meta": {
+            "pages": pages,
+            "shape": shape,
+            "blocks": blocks,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "stages": timings,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each stage of the generator on a synthetic corpus.")
+    parser.add_argument("--pages", type=int, default=100, help="pages in the corpus (10 to 100000 are sensible)")
+    parser.add_argument("--shape", choices=SHAPES, default="mixed")
+    parser.add_argument("--blocks", type=int, default=20, help="blocks per page")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest one is kept")
+    parser.add_argument("--src", default=SRC_DIR, help="source tree to benchmark")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+    
+    results = run(args.pages, args.shape, args.blocks, args.repeat, args.src)
+    for stage in STAGES:
+        print(f"{stage:20} {results['stages'][stage] * 1000:10.2f} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,32 @@
+import unittest
+from benchmarks.compare import compare
+
+def run(**stages):
+    return {"stages": stages}
+
+class TestCompare(unittest.TestCase):
+    def test_threshold(self):
+        baseline = run(to_html=2.0)
+        for after, regressed in ((2.4999, False), (2.5001, True)):
+            rows, regressions = compare(baseline, run(to_html=after), 25.0)
+            self.assertEqual([(stage, before) for stage, before, _, _ in rows], [("to_html", 2.0)])
+            self.assertEqual(regressions, ["to_html"] if regressed else [])
+    
+    def test_exactly_at_threshold_is_not_a_regression(self):
+        rows, regressions = compare(run(build=2.0), run(build=2.5), 25.0)
+        self.assertEqual(rows, [("build", 2.0, 2.5, 25.0)])
+        self.assertEqual(regressions, [])
+    
+    def test_stage_missing_from_either_run(self):
+        baseline = run(to_html=1.0, build=1.0)
+        current = run(to_html=1.0, markdown_to_blocks=1.0)
+        rows, regressions = compare(baseline, current, 10.0)
+        self.assertEqual(rows, [("to_html", 1.0, 1.0, 0.0)])
+        self.assertEqual(regressions, [])
+        rows, regressions = compare(current, baseline, 10.0)
+        self.assertEqual([row[0] for row in rows], ["to_html"])
+        self.assertEqual(regressions, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import re
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from manifest import GENERATOR_VERSION, includes_hash
+from markdown_blocks import PageInfo
+
+BUILD_CACHE_DIR = os.path.join(".ssg", "cache", "build")
+DEFAULT_WORKERS = 8
+_KEY = re.compile(r"[0-9a-f]{64}")
+
+class DirectoryStore:
+    # A plain directory tree, so CI can save and restore it between runs.
+    def __init__(self, directory=BUILD_CACHE_DIR):
+        self.directory = directory
+    
+    def __str__(self):
+        return self.directory
+    
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+    
+    def get(self, key):
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    def put(self, key, data):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+class HttpStore:
+    # GET/PUT {url}/{key}, as spoken by serve_build_cache or any plain
+    # object store that accepts PUTs.
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+    
+    def __str__(self):
+        return self.url
+    
+    def get(self, key):
+        try:
+            with urllib.request.urlopen(f"{self.url}/{key}", timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+    
+    def put(self, key, data):
+        request = urllib.request.Request(f"{self.url}/{key}", data=data, method="PUT")
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+def open_store(location):
+    if location.startswith(("http://", "https://")):
+        return HttpStore(location)
+    return DirectoryStore(location)
+
+def images_hash(info, images):
+    return images.page_hash(info.image_urls()) if images is not None else None
+
+def pack(html, info, images=None):
+    header = {
+        "info": info.to_dict(),
+        "terms": info.terms,
+        "includes_hash": includes_hash(info.includes),
+        "images_hash": images_hash(info, images),
+    }
+    return json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n" + html
+
+def unpack(data):
+    header, sep, html = data.partition(b"\n")
+    return json.loads(header), html
+
+class BuildCache:
+    # Finished pages keyed on everything that goes into them, shared between
+    # builds and machines. The key cannot cover partials or image sizes,
+    # which are only known after parsing, so each entry records their hashes
+    # and is checked against the files on disk before it is used.
+    def __init__(self, store, workers=DEFAULT_WORKERS):
+        self.store = store
+        self.workers = workers
+        # Created on the first put: by then the render pool has forked its
+        # workers, which must not inherit live threads.
+        self.pool = None
+        self.puts = []
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.stored = 0
+        self.bytes_written = 0
+    
+    def key(self, source_hash, template_hash, basepath, assets_hash=None, minify=False, images=None, terms=False):
+        # terms: entries stored by builds without a search index carry none.
+        image_mode = "" if images is None else "priority" if images.priority_first else "lazy"
+        fields = (
+            GENERATOR_VERSION,
+            source_hash,
+            template_hash,
+            basepath,
+            assets_hash or "",
+            "1" if minify else "0",
+            image_mode,
+            "terms" if terms else "",
+        )
+        return hashlib.sha256("\0".join(fields).encode("utf-8")).hexdigest()
+    
+    def _get(self, key):
+        # A cache that cannot be reached is a slow build, never a failed one.
+        try:
+            return self.store.get(key)
+        except (OSError, ValueError):
+            return False
+    
+    def fetch(self, pages, keys, images=None):
+        # Writes every page found in the cache to its destination and returns
+        # {dest_path: PageInfo} for them; the rest still need rendering.
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            found = list(pool.map(lambda page: self._get(keys[page[1]]), pages))
+        infos = {}
+        for (src, dst), data in zip(pages, found):
+            if not data:
+                self.misses += 1
+                self.errors += data is False
+                continue
+            header, html = unpack(data)
+            info = PageInfo.from_dict(header["info"])
+            if includes_hash(info.includes) != header["includes_hash"] or images_hash(info, images) != header.get("images_hash"):
+                self.stale += 1
+                continue
+            info.terms = header["terms"]
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            tmp_path = f"{dst}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(html)
+            os.replace(tmp_path, dst)
+            print(f"Restored page {dst} from the build cache")
+            infos[dst] = info
+            self.hits += 1
+            self.bytes_read += len(data)
+        return infos
+    
+    def put(self, key, dest_path, info, images=None):
+        # Called as each rendered page comes in; uploads overlap the render.
+        with open(dest_path, "rb") as f:
+            data = pack(f.read(), info, images)
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.puts.append(self.pool.submit(self._put, key, data))
+    
+    def _put(self, key, data):
+        try:
+            self.store.put(key, data)
+        except (OSError, ValueError):
+            return 0
+        return len(data)
+    
+    def close(self):
+        written = [future.result() for future in self.puts]
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self.puts = []
+        self.stored += sum(1 for size in written if size)
+        self.bytes_written += sum(written)
+        self.errors += sum(1 for size in written if not size)
+    
+    def summary(self):
+        lookups = self.hits + self.misses + self.stale
+        rate = self.hits / lookups if lookups else 0.0
+        return (
+            f"Build cache ({self.store}): {self.hits} hit(s), {self.misses} miss(es), {self.stale} stale "
+            f"({rate:.1%} hit rate); read {self.bytes_read / 1024:.1f} KiB, stored {self.stored} page(s) "
+            f"({self.bytes_written / 1024:.1f} KiB), {self.errors} error(s)"
+        )
+
+class BuildCacheRequestHandler(BaseHTTPRequestHandler):
+    def __init__(self, *args, store=None, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+    
+    def _key(self):
+        key = self.path.strip("/")
+        if not _KEY.fullmatch(key):
+            self.send_error(404)
+            return None
+        return key
+    
+    def do_GET(self):
+        key = self._key()
+        if key is None:
+            return
+        data = self.store.get(key)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_PUT(self):
+        key = self._key()
+        if key is None:
+            return
+        self.store.put(key, self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.send_response(204)
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        pass
+
+def make_build_cache_server(directory, port, host="127.0.0.1"):
+    handler = partial(BuildCacheRequestHandler, store=DirectoryStore(directory))
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    return httpd
+
+def serve_build_cache(directory=BUILD_CACHE_DIR, port=8890, host="127.0.0.1"):
+    # A local stand-in for a shared cache service, backed by a directory.
+    with make_build_cache_server(directory, port, host) as httpd:
+        print(f"Serving the build cache in {directory} at http://{host}:{httpd.server_address[1]}/")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+import re
+from collections import namedtuple
+
+IGNORE_FILE = ".ssgignore"
+_GLOB = re.compile(r"(\*\*/|\*\*|\*|\?)")
+_GLOB_REGEX = {"**/": "(?:.*/)?", "**": ".*", "*": "[^/]*", "?": "[^/]"}
+
+def is_hidden(name):
+    # Dotfiles, and the Zone.Identifier streams Windows leaves next to downloads.
+    return name.startswith(".") or "Zone.Identifier" in name
+
+def _translate(pattern):
+    return re.compile("".join(_GLOB_REGEX.get(part) or re.escape(part) for part in _GLOB.split(pattern)) + r"\Z")
+
+class IgnoreRules:
+    # The everyday subset of .gitignore syntax: *, ? and ** globs, a / at the
+    # start or in the middle to anchor a pattern to the root, a trailing / to
+    # match directories only, ! to re-include and # for comments. Like git,
+    # an ignored directory is never entered, so nothing inside it can be
+    # re-included.
+    def __init__(self, lines=()):
+        self.rules = []
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            self.rules.append((_translate(line.lstrip("/")), negate, dir_only, anchored))
+    
+    @classmethod
+    def load(cls, root):
+        try:
+            with open(os.path.join(root, IGNORE_FILE), encoding="utf-8") as f:
+                return cls(f.read().splitlines())
+        except FileNotFoundError:
+            return cls()
+    
+    def ignored(self, rel, is_dir=False):
+        # rel is relative to the root and /-separated; the last matching
+        # pattern wins.
+        name = rel.rsplit("/", 1)[-1]
+        ignored = False
+        for regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel if anchored else name):
+                ignored = not negate
+        return ignored
+
+class FileEntry(namedtuple("FileEntry", ["rel", "path", "dir_entry"])):
+    __slots__ = ()
+    
+    def stat(self):
+        # os.DirEntry keeps the result, so however many stages ask, a file is
+        # stat'ed at most once per scan, and only if someone needs it.
+        return self.dir_entry.stat()
+
+def scan_tree(root, skip=is_hidden, rules=None):
+    # Every file under root that is neither skipped by name nor ignored by
+    # root's .ssgignore, in sorted path order. File types come from the
+    # directory listing itself, so walking costs one scandir per directory
+    # and no per-entry stat calls.
+    if rules is None:
+        rules = IgnoreRules.load(root)
+    files = []
+    _scan(root, "", "", skip, rules, files)
+    return files
+
+def _scan(directory, prefix, posix_prefix, skip, rules, files):
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if skip(entry.name):
+            continue
+        is_dir = entry.is_dir()
+        posix_rel = posix_prefix + entry.name
+        if rules.ignored(posix_rel, is_dir):
+            continue
+        rel = os.path.join(prefix, entry.name)
+        if is_dir:
+            _scan(entry.path, rel, posix_rel + "/", skip, rules, files)
+        elif entry.is_file():
+            files.append(FileEntry(rel, entry.path, entry))
\ No newline at end of file
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from manifest import file_hash, source_hash
+
+HASH_LENGTH = 10
+DEPLOY_MANIFEST_PATH = os.path.join(".ssg", "deploy.json")
+
+_URL_ATTR = re.compile(r'\b(href|src)="([^"]*)"')
+
+def fingerprint_name(rel, digest):
+    head, ext = os.path.splitext(rel)
+    return f"{head}.{digest[:HASH_LENGTH]}{ext}"
+
+def _place(plain_path, hashed_path):
+    if os.path.exists(hashed_path):
+        return
+    tmp_path = f"{hashed_path}.{os.getpid()}.tmp"
+    try:
+        os.link(plain_path, tmp_path)
+    except OSError:
+        shutil.copy2(plain_path, tmp_path)
+    os.replace(tmp_path, hashed_path)
+
+def fingerprint_assets(dst, files, manifest=None):
+    # Every synced asset also gets a content-hashed twin next to it; pages
+    # reference the twin, the plain name stays so differential sync works.
+    previous = manifest.get("fingerprints", {}) if manifest is not None else {}
+    fingerprints = {}
+    for rel in files:
+        plain_path = os.path.join(dst, rel)
+        st = os.stat(plain_path)
+        entry = previous.get(rel)
+        digest = source_hash(entry, plain_path, st)
+        name = fingerprint_name(rel, digest)
+        _place(plain_path, os.path.join(dst, name))
+        fingerprints[rel] = {"name": name, "source_hash": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    
+    live = {entry["name"] for entry in fingerprints.values()}
+    for entry in previous.values():
+        if entry["name"] not in live:
+            path = os.path.join(dst, entry["name"])
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"Removed stale fingerprinted file: {path}")
+    if manifest is not None:
+        manifest["fingerprints"] = fingerprints
+    print(f"Fingerprinted {len(fingerprints)} static file(s)")
+    return {rel: entry["name"] for rel, entry in fingerprints.items()}
+
+def fingerprint_names(src, files):
+    # What fingerprint_assets would name each file, for a shard that
+    # references the assets but leaves copying them to another shard.
+    return {rel: fingerprint_name(rel, file_hash(os.path.join(src, rel))) for rel in files}
+
+def asset_urls(fingerprints, basepath="/"):
+    return {
+        basepath + rel.replace(os.sep, "/"): basepath + name.replace(os.sep, "/")
+        for rel, name in fingerprints.items()
+    }
+
+def urls_hash(urls):
+    if not urls:
+        return None
+    h = hashlib.sha256()
+    for url in sorted(urls):
+        h.update(f"{url}\0{urls[url]}\0".encode("utf-8"))
+    return h.hexdigest()
+
+class UrlRewriter:
+    # Wraps an output file and swaps asset URLs in href/src attributes as
+    # fragments stream through. Rendered attributes are never split across
+    # fragments, so a per-fragment substitution sees each one whole.
+    __slots__ = ("fp", "urls")
+    
+    def __init__(self, fp, urls):
+        self.fp = fp
+        self.urls = urls
+    
+    def _replace(self, match):
+        url = self.urls.get(match.group(2))
+        if url is None:
+            return match.group(0)
+        return f'{match.group(1)}="{url}"'
+    
+    def write(self, fragment):
+        if "=" in fragment:
+            fragment = _URL_ATTR.sub(self._replace, fragment)
+        return self.fp.write(fragment)
+
+def load_deploy_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def write_deploy_manifest(path, dst, exclude=()):
+    previous = load_deploy_manifest(path)
+    exclude = set(exclude)
+    files = {}
+    for root, dirs, names in os.walk(dst):
+        dirs.sort()
+        for name in sorted(names):
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, dst).replace(os.sep, "/")
+            if rel not in exclude:
+                files[rel] = file_hash(full)
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"files": files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    
+    changed = sorted(rel for rel, digest in files.items() if previous.get(rel) != digest)
+    removed = sorted(set(previous) - set(files))
+    print(f"Deploy manifest: {len(files)} file(s), {len(changed)} changed, {len(removed)} removed since last build")
+    return files, changed, removed
\ No newline at end of file
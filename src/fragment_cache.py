@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+
+class FragmentCache:
+    # Build-scoped memo of rendered blocks keyed on (block type, block text),
+    # plus partials that are parsed once and spliced into every page using
+    # them. Nothing here outlives the build, so no invalidation is needed.
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.partials = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.partial_uses = 0
+    
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "partials": len(self.partials),
+            "partial_uses": self.partial_uses,
+        }
+    
+    def take_stats(self):
+        # Counters since the last call; workers hand these back per page.
+        stats = self.stats()
+        self.hits = self.misses = self.evictions = self.partial_uses = 0
+        return stats
+    
+    def merge_stats(self, stats):
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+        self.evictions += stats["evictions"]
+        self.partial_uses += stats["partial_uses"]
+    
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return (
+            f"Fragment cache: {self.hits} hit(s), {self.misses} miss(es) ({rate:.1%} hit rate), "
+            f"{self.evictions} eviction(s); {self.partial_uses} partial include(s)"
+        )
\ No newline at end of file
@@ -0,0 +1,82 @@
+import datetime
+from itertools import chain
+
+FENCE = "---"
+# Give up looking for the closing fence after this many lines, so a file
+# that merely starts with a horizontal rule is never read to the end.
+MAX_HEADER_LINES = 100
+
+def parse_value(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.startswith("[") and text.endswith("]"):
+        return [parse_value(item) for item in text[1:-1].split(",") if item.strip()]
+    if text.lower() in ("true", "yes"):
+        return True
+    if text.lower() in ("false", "no"):
+        return False
+    return text
+
+def parse_meta(lines):
+    # The YAML subset front matter needs: "key: value" pairs, inline
+    # [a, b] lists and "- item" lists under a key with no value.
+    meta = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None and isinstance(meta[key], list):
+            meta[key].append(parse_value(stripped[2:]))
+            continue
+        name, sep, value = stripped.partition(":")
+        if not sep:
+            raise ValueError(f"invalid front matter line: {line.rstrip()}")
+        key = name.strip()
+        meta[key] = parse_value(value) if value.strip() else []
+    return meta
+
+def split_front_matter(lines):
+    # Returns (meta, body lines). Only the header is consumed from the
+    # iterable; its lines come back blank so body line numbers still
+    # match the file.
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.strip() != FENCE:
+        return {}, chain([first], lines)
+    header = []
+    for line in lines:
+        if line.strip() == FENCE:
+            return parse_meta(header), chain([""] * (len(header) + 2), lines)
+        header.append(line)
+        if len(header) >= MAX_HEADER_LINES:
+            break
+    return {}, chain([first], header, lines)
+
+def read_front_matter(path):
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            meta, body = split_front_matter(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+    return meta
+
+def page_date(meta):
+    value = meta.get("date")
+    if not value:
+        return None
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+def is_published(meta, today=None):
+    if meta.get("draft") is True:
+        return False
+    date = page_date(meta)
+    return date is None or date <= (today or datetime.date.today())
\ No newline at end of file
@@ -1,6 +1,58 @@
+import re
 from enum import Enum
+from profiling import span
+
+URL_PROPS = ("href", "src")
+
+# Minification: whitespace inside these is significant and kept verbatim.
+RAW_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+# Whitespace next to these never renders, so it can be dropped entirely.
+BLOCK_TAGS = frozenset((
+    "!doctype", "html", "head", "body", "title", "meta", "link", "script", "style",
+    "main", "article", "section", "nav", "aside", "header", "footer", "div", "p",
+    "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+    "blockquote", "pre", "table", "thead", "tbody", "tfoot", "tr", "td", "th",
+    "hr", "br", "form", "fieldset", "figure", "figcaption", "details", "summary",
+))
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"))
+# A </p> may be left out when the next sibling is one of these.
+_P_CLOSERS = frozenset((
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hgroup", "hr", "main", "menu", "nav", "ol", "p", "pre", "section",
+    "table", "ul",
+))
+# ...or when it is the last child, unless its parent is one of these.
+_P_KEEPERS = frozenset(("a", "audio", "del", "ins", "map", "noscript", "video"))
+_WHITESPACE = re.compile(r"\s+")
+# to_html joins its pieces into a chunk every this many, so a large page
+# never holds millions of tiny strings at once.
+_CHUNK = 4096
+
+def collapse_whitespace(text):
+    return _WHITESPACE.sub(" ", text)
+
+def omit_end_tag(tag, parent, following):
+    # following is the next sibling's tag, None at the end of the parent and
+    # "" for a text sibling or an unknown position.
+    if tag in VOID_TAGS:
+        return True
+    if tag == "li":
+        return following is None or following == "li"
+    if tag == "p":
+        if following is None:
+            return parent is not None and parent not in _P_KEEPERS
+        return following in _P_CLOSERS
+    return False
+
+def rebase_url(prop, value, basepath):
+    if prop in URL_PROPS and value.startswith("/"):
+        return basepath + value[1:]
+    return value
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -10,27 +62,121 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("to_html method not implemented")
     
-    def props_to_html(self):
+    def props_to_html(self, basepath="/"):
         if self.props is None:
             return ""
-        lst = ""
-        for prop in self.props:
-            lst += f' {prop}="{self.props[prop]}"'
-        return lst
+        if basepath == "/":
+            return "".join([f' {prop}="{value}"' for prop, value in self.props.items()])
+        return "".join([f' {prop}="{rebase_url(prop, value, basepath)}"' for prop, value in self.props.items()])
+    
+    def _open(self, basepath, minify=False):
+        # (opening fragment, children, closing fragment); nodes that only
+        # know how to render themselves as a whole fall back to to_html().
+        return self.to_html(), None, None
+    
+    def iter_html(self, basepath="/", minify=False):
+        if minify:
+            yield from _iter_minified([(self, None, "", False)], basepath)
+            return
+        # Explicit stack instead of recursion, so arbitrarily deep trees
+        # serialize without hitting the interpreter's recursion limit. Same
+        # walk as _render, yielding each fragment instead of collecting it.
+        stack = [((self,), 0, None)]
+        while stack:
+            children, i, closing = stack.pop()
+            n = len(children)
+            while i < n:
+                node = children[i]
+                i += 1
+                cls = node.__class__
+                if cls is LeafNode:
+                    yield _leaf_html(node, basepath)
+                    continue
+                if cls is ParentNode:
+                    tag = _parent_tag(node)
+                    yield f"<{tag}{node.props_to_html(basepath)}>" if node.props else f"<{tag}>"
+                    inner, inner_closing = node.children, f"</{tag}>"
+                else:
+                    opening, inner, inner_closing = node._open(basepath)
+                    yield opening
+                if inner:
+                    stack.append((children, i, closing))
+                    children, i, closing, n = inner, 0, inner_closing, len(inner)
+                elif inner_closing:
+                    yield inner_closing
+            if closing:
+                yield closing
+    
+    def _render(self, basepath="/"):
+        # to_html's fast path: leaves, most of any tree, are appended straight
+        # to one list from a loop over their parent's children, and only
+        # parents push a (children, next index, closing tag) frame.
+        chunks = []
+        out = []
+        append = out.append
+        stack = [((self,), 0, None)]
+        while stack:
+            children, i, closing = stack.pop()
+            n = len(children)
+            while i < n:
+                node = children[i]
+                i += 1
+                cls = node.__class__
+                if cls is LeafNode:
+                    value = node.value
+                    if value is None:
+                        raise ValueError("invalid HTML: no value")
+                    tag = node.tag
+                    if tag is None:
+                        append(value)
+                    elif node.props:
+                        append(f"<{tag}{node.props_to_html(basepath)}>{value}</{tag}>")
+                    else:
+                        append(f"<{tag}>{value}</{tag}>")
+                    continue
+                if cls is ParentNode:
+                    tag = _parent_tag(node)
+                    append(f"<{tag}{node.props_to_html(basepath)}>" if node.props else f"<{tag}>")
+                    inner, inner_closing = node.children, f"</{tag}>"
+                else:
+                    opening, inner, inner_closing = node._open(basepath)
+                    append(opening)
+                if inner:
+                    stack.append((children, i, closing))
+                    children, i, closing, n = inner, 0, inner_closing, len(inner)
+                elif inner_closing:
+                    append(inner_closing)
+            if closing:
+                append(closing)
+            if len(out) >= _CHUNK:
+                chunks.append("".join(out))
+                out.clear()
+        chunks.append("".join(out))
+        return "".join(chunks)
+    
+    def write_html(self, fp, basepath="/", minify=False):
+        write = fp.write
+        for fragment in self.iter_html(basepath, minify):
+            write(fragment)
     
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
     def to_html(self):
+        return self._open("/")[0]
+    
+    def _open(self, basepath, minify=False):
         if self.value != None:
             if self.tag != None:
-                return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-            return self.value
+                return f"<{self.tag}{self.props_to_html(basepath)}>{self.value}</{self.tag}>", None, None
+            return self.value, None, None
         raise ValueError("invalid HTML: no value")
     
     def __repr__(self):
@@ -38,18 +184,111 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
+        with span("to_html"):
+            return self._render()
+    
+    def _open(self, basepath, minify=False):
         if self.tag != None:
             if self.children != None:
-                string = ""
-                for child in self.children:
-                    string += child.to_html()
-                return f"<{self.tag}{self.props_to_html()}>{string}</{self.tag}>"
+                return f"<{self.tag}{self.props_to_html(basepath)}>", self.children, f"</{self.tag}>"
             raise ValueError("invalid HTML: no children")
         raise ValueError("invalid HTML: no tag")
     
     def __repr__(self):
-        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
\ No newline at end of file
+        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+
+
+class FragmentNode(ParentNode):
+    # A block shared by many pages: its children are serialized once per
+    # (basepath, minify) and every page after the first reuses the string.
+    __slots__ = ("rendered",)
+    
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, children, props)
+        self.rendered = {}
+    
+    def inner_html(self, basepath="/", minify=False):
+        key = (basepath, minify)
+        html = self.rendered.get(key)
+        if html is None:
+            if minify:
+                entries = _child_entries(self.children, self.tag, self.tag in RAW_TAGS)
+                html = "".join(_iter_minified(entries, basepath))
+            else:
+                html = "".join([child._render(basepath) for child in self.children])
+            self.rendered[key] = html
+        return html
+    
+    def _open(self, basepath, minify=False):
+        opening, children, closing = super()._open(basepath)
+        return opening + self.inner_html(basepath, minify), None, closing
+    
+    def __repr__(self):
+        return f"FragmentNode({self.tag}, children: {self.children}, {self.props})"
+
+def _leaf_html(node, basepath):
+    # LeafNode._open without the tuple, for the serializers' hot loops.
+    value = node.value
+    if value is None:
+        raise ValueError("invalid HTML: no value")
+    tag = node.tag
+    if tag is None:
+        return value
+    if node.props:
+        return f"<{tag}{node.props_to_html(basepath)}>{value}</{tag}>"
+    return f"<{tag}>{value}</{tag}>"
+
+def _parent_tag(node):
+    if node.tag is None:
+        raise ValueError("invalid HTML: no tag")
+    if node.children is None:
+        raise ValueError("invalid HTML: no children")
+    return node.tag
+
+def _child_entries(children, tag, raw):
+    # Stack entries for children, last child first so the first pops first.
+    entries = []
+    for i in range(len(children) - 1, -1, -1):
+        following = children[i + 1].tag or "" if i + 1 < len(children) else None
+        entries.append((children[i], tag, following, raw))
+    return entries
+
+def _iter_minified(stack, basepath):
+    # Same walk as iter_html, but each entry also carries its parent's tag,
+    # the next sibling's tag and whether it sits inside <pre>/<code>, which
+    # is what deciding on whitespace and optional end tags needs.
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            yield item
+            continue
+        node, parent, following, raw = item
+        tag = node.tag
+        if isinstance(node, LeafNode):
+            if node.value is None:
+                raise ValueError("invalid HTML: no value")
+            value = node.value if raw or tag in RAW_TAGS else collapse_whitespace(node.value)
+            if tag is None:
+                yield value
+            elif omit_end_tag(tag, parent, following):
+                yield f"<{tag}{node.props_to_html(basepath)}>{value}"
+            else:
+                yield f"<{tag}{node.props_to_html(basepath)}>{value}</{tag}>"
+            continue
+        if not isinstance(node, ParentNode):
+            yield from node.iter_html(basepath)
+            continue
+        opening, children, closing = node._open(basepath, True)
+        yield opening
+        if not raw and omit_end_tag(tag, parent, following):
+            closing = ""
+        if closing:
+            stack.append(closing)
+        if children:
+            stack.extend(_child_entries(children, tag, raw or tag in RAW_TAGS))
\ No newline at end of file
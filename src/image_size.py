@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+import struct
+from urllib.parse import unquote, urlsplit
+
+# Quoted values may hold a ">" (alt text often does), so they are matched whole.
+_IMG = re.compile(r"""<img\b(?:[^>"']|"[^"]*"|'[^']*')*>""")
+_ATTR = re.compile(r"""\s([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?""")
+# Start-of-frame markers, the JPEG segments that carry the dimensions.
+_JPEG_SOF = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if marker in _JPEG_SOF:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+        # Skip the segment, EXIF thumbnails and all, without reading it.
+        f.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+def read_image_size(f):
+    # (width, height) from the PNG, GIF, WebP or JPEG header of a binary
+    # file, or None when the format is not one of those or is truncated.
+    head = f.read(30)
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", head[6:10])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        chunk = head[12:16]
+        if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L" and head[20] == 0x2F:
+            bits = int.from_bytes(head[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+        return None
+    if head[:2] == b"\xff\xd8":
+        return _jpeg_size(f)
+    return None
+
+# path -> (mtime_ns, size, dimensions); per process, so each render worker
+# reads an image's header at most once however many pages show it.
+_sizes = {}
+
+def image_size(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cached = _sizes.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    try:
+        with open(path, "rb") as f:
+            size = read_image_size(f)
+    except (OSError, struct.error, IndexError):
+        size = None
+    _sizes[path] = (st.st_mtime_ns, st.st_size, size)
+    return size
+
+class ImageSizes:
+    # Settings for sizing the local images pages reference; small enough to
+    # hand to every render worker.
+    def __init__(self, static_dir, priority_first=False):
+        self.static_dir = os.path.abspath(static_dir)
+        self.priority_first = priority_first
+    
+    def path_for_url(self, url):
+        # Site-absolute URLs map onto the static tree; anything else (other
+        # hosts, relative paths) is left unsized.
+        if not url.startswith("/") or url.startswith("//"):
+            return None
+        path = os.path.normpath(os.path.join(self.static_dir, unquote(urlsplit(url).path).lstrip("/")))
+        if os.path.commonpath([path, self.static_dir]) != self.static_dir:
+            return None
+        return path
+    
+    def size_for_url(self, url):
+        path = self.path_for_url(url)
+        return image_size(path) if path is not None else None
+    
+    def page_hash(self, urls):
+        # Covers the dimensions of every image a page shows, so a page is
+        # re-rendered when an image is replaced by one of another size.
+        h = hashlib.sha256(b"priority" if self.priority_first else b"lazy")
+        for url in urls:
+            h.update(f"\0{url}\0{self.size_for_url(url)}".encode("utf-8"))
+        return h.hexdigest()
+    
+    def writer(self, fp, basepath="/"):
+        return ImageRewriter(fp, self, basepath)
+
+class ImageRewriter:
+    # Wraps an output file, like UrlRewriter, and completes every <img> tag
+    # streaming through with its size and loading hints. Tags are never
+    # split across fragments.
+    __slots__ = ("fp", "images", "basepath", "seen")
+    
+    def __init__(self, fp, images, basepath="/"):
+        self.fp = fp
+        self.images = images
+        self.basepath = basepath
+        self.seen = 0
+    
+    def _attributes(self, tag):
+        present = {}
+        for match in _ATTR.finditer(tag, 4):
+            value = match.group(2) or ""
+            present[match.group(1).lower()] = value[1:-1] if value[:1] in ("\"", "'") else value
+        attrs = []
+        url = present.get("src")
+        if url and "width" not in present and "height" not in present:
+            if url.startswith(self.basepath):
+                url = "/" + url[len(self.basepath):]
+            size = self.images.size_for_url(url)
+            if size is not None:
+                attrs.append(f' width="{size[0]}" height="{size[1]}"')
+        if "loading" not in present and "fetchpriority" not in present:
+            # The first image is the likeliest to be above the fold, so it
+            # is fetched eagerly and early instead of lazily.
+            if self.seen == 0 and self.images.priority_first:
+                attrs.append(' fetchpriority="high"')
+            else:
+                attrs.append(' loading="lazy"')
+        if "decoding" not in present:
+            attrs.append(' decoding="async"')
+        self.seen += 1
+        return "".join(attrs)
+    
+    def _replace(self, match):
+        tag = match.group(0)
+        end = len(tag) - 2 if tag.endswith("/>") else len(tag) - 1
+        return tag[:end].rstrip() + self._attributes(tag) + tag[end:]
+    
+    def write(self, fragment):
+        if "<img" in fragment:
+            fragment = _IMG.sub(self._replace, fragment)
+        return self.fp.write(fragment)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import json
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+from manifest import GENERATOR_VERSION, save_manifest
+from markdown_blocks import parse_page
+
+# Links and anchors of every page, kept apart from the manifest so that
+# only builds that check links load them.
+LINKS_PATH = os.path.join(".ssg", "links.json")
+
+class BrokenLinksError(Exception):
+    pass
+
+class BrokenLink:
+    __slots__ = ("source", "line", "kind", "target", "reason")
+    
+    def __init__(self, source, line, kind, target, reason):
+        self.source = source
+        self.line = line
+        self.kind = kind
+        self.target = target
+        self.reason = reason
+    
+    def __str__(self):
+        return f"{self.source}:{self.line}: broken {self.kind} {self.target} ({self.reason})"
+
+def output_url(dest_path, dest_dir):
+    # Output paths are joined onto dest_dir, so slicing it off is enough;
+    # relpath is only needed for anything else.
+    prefix = os.path.join(dest_dir, "")
+    if dest_path.startswith(prefix):
+        rel = dest_path[len(prefix):]
+    else:
+        rel = os.path.relpath(dest_path, dest_dir)
+    return "/" + rel.replace(os.sep, "/")
+
+def is_external(target):
+    parts = urlsplit(target)
+    return bool(parts.scheme) or target.startswith("//")
+
+class LinkIndex:
+    def __init__(self):
+        # url -> (source, anchors, links) for every rendered page.
+        self.pages = {}
+        self.assets = set()
+    
+    def add_page(self, url, source, info):
+        self.pages[url] = (source, set(info.anchors), info.links)
+    
+    def add_asset(self, url):
+        self.assets.add(url)
+    
+    def resolve(self, url):
+        if url in self.pages or url in self.assets:
+            return url
+        candidate = url.rstrip("/") + "/index.html"
+        if candidate in self.pages:
+            return candidate
+        if url + ".html" in self.pages:
+            return url + ".html"
+        return None
+    
+    def target_url(self, page_url, target):
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        if not path:
+            return page_url, parts.fragment
+        if not path.startswith("/"):
+            path = posixpath.join(posixpath.dirname(page_url), path)
+        normalized = posixpath.normpath(path)
+        if path.endswith("/") and normalized != "/":
+            normalized += "/"
+        return normalized, parts.fragment
+    
+    def validate(self):
+        broken = []
+        for page_url in sorted(self.pages):
+            source, anchors, links = self.pages[page_url]
+            for kind, target, line in links:
+                if is_external(target):
+                    continue
+                url, fragment = self.target_url(page_url, target)
+                resolved = self.resolve(url)
+                if resolved is None:
+                    broken.append(BrokenLink(source, line, kind, target, "no such page or file"))
+                elif fragment and (resolved not in self.pages or fragment not in self.pages[resolved][1]):
+                    broken.append(BrokenLink(source, line, kind, target, f"no anchor #{fragment}"))
+        return broken
+    
+    def graph(self):
+        nodes = {}
+        for page_url in sorted(self.pages):
+            source, anchors, links = self.pages[page_url]
+            edges = []
+            for kind, target, line in links:
+                if is_external(target):
+                    edges.append({"kind": kind, "target": target, "line": line, "external": True})
+                    continue
+                url, fragment = self.target_url(page_url, target)
+                edges.append({"kind": kind, "target": self.resolve(url) or url, "fragment": fragment, "line": line})
+            nodes[page_url] = {"source": source, "anchors": sorted(anchors), "links": edges}
+        return {"pages": nodes, "assets": sorted(self.assets)}
+    
+    def write_graph(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.graph(), f, indent=1)
+
+def load_link_records(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(records, dict) or records.get("version") != GENERATOR_VERSION:
+        return {}
+    return records.get("pages", {})
+
+def save_link_records(path, records):
+    save_manifest(path, {"version": GENERATOR_VERSION, "pages": records})
+
+def fill_links(pages, entries, records, cache=None):
+    # Gives skipped pages (links None) their links and anchors: from the
+    # record while the source and its includes are unchanged, otherwise by
+    # parsing the source again. records is brought up to date for every
+    # page in entries; returns whether it changed.
+    changed = False
+    for dest_path, (source, info) in pages.items():
+        entry = entries.get(dest_path)
+        key = [entry["source_hash"], entry["includes_hash"]] if entry is not None else None
+        record = records.get(dest_path)
+        if info.links is None:
+            if record is not None and record["key"] == key:
+                info.links = [tuple(link) for link in record["links"]]
+                info.anchors = list(record["anchors"])
+                continue
+            node, parsed, meta = parse_page(source, cache)
+            info.links, info.anchors = parsed.links, parsed.anchors
+        if key is None:
+            continue
+        fresh = {"key": key, "links": [list(link) for link in info.links], "anchors": list(info.anchors)}
+        if record != fresh:
+            records[dest_path] = fresh
+            changed = True
+    for dest_path in set(records) - set(entries):
+        del records[dest_path]
+        changed = True
+    return changed
+
+def build_link_index(pages, dest_dir, assets):
+    index = LinkIndex()
+    for dest_path, (source, info) in pages.items():
+        index.add_page(output_url(dest_path, dest_dir), source, info)
+    for rel in assets:
+        index.add_asset("/" + rel.replace(os.sep, "/"))
+    return index
\ No newline at end of file
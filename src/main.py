@@ -1,35 +1,532 @@
-import shutil
+import argparse
 import sys
 import os
-from markdown_blocks import generate_pages_recursive
-
-def copy_dir(src, dst):
-    if not os.path.exists(dst):
-        os.makedirs(dst)
-    for name in os.listdir(src):
-        if name.startswith(".") or "Zone.Identifier" in name:
-            continue
-        src_path = os.path.join(src, name)
-        dst_path = os.path.join(dst, name)
-        if os.path.isfile(src_path):
-            shutil.copy(src_path, dst_path)
-            print(f"Copied file: {src_path} -> {dst_path}")
-        else:
-            copy_dir(src_path, dst_path)
-
-def main():
-    basepath = "/"
-    if len(sys.argv) >=2:
-        basepath = sys.argv[1]
-    src_dir = "static"
-    dst_dir = "docs"
-    if os.path.exists(dst_dir):
-        shutil.rmtree(dst_dir)
-    os.mkdir(dst_dir)
-    
-    copy_dir(src_dir, dst_dir)
-    
-    generate_pages_recursive(basepath, "content", "template.html", dst_dir)
+from markdown_blocks import PageInfo, generate_pages_recursive
+from manifest import MANIFEST_PATH, load_manifest, manifest_changed, manifest_snapshot, new_manifest, save_manifest
+from server import serve
+from render_server import serve_render
+from static_sync import clear_output, list_files, sync_static
+from linkcheck import LINKS_PATH, BrokenLinksError, build_link_index, fill_links, load_link_records, save_link_records
+from fingerprint import DEPLOY_MANIFEST_PATH, asset_urls, fingerprint_assets, fingerprint_names, write_deploy_manifest
+from precompress import DEFAULT_MIN_SIZE, VARIANT_EXTENSIONS, precompress
+from profiling import span
+from discovery import scan_tree
+from parse_cache import CACHE_DIR, ParseCache
+from fragment_cache import DEFAULT_MAX_ENTRIES, FragmentCache
+from site_index import DEFAULT_PER_PAGE, DEFAULT_SECTION, write_site_index
+from search_index import DEFAULT_MEMORY_MB, SEARCH_DIR, SearchIndexer, remove_search_index
+from shard import MergeError, merge_shards, owns_site_files, parse_shard
+from build_cache import BUILD_CACHE_DIR, BuildCache, open_store, serve_build_cache
+from image_size import ImageSizes
+import profiling
+
+SRC_DIR = "static"
+DST_DIR = "docs"
+CONTENT_DIR = "content"
+TEMPLATE_PATH = "template.html"
+TRACE_PATH = os.path.join(".ssg", "trace.json")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"keep the output directory and only re-render pages whose inputs changed (state in {MANIFEST_PATH}); "
+        "without it only unchanged static file copies are kept",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="hardlink static files into the output instead of copying them (edits to outputs then change the sources)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=TRACE_PATH,
+        metavar="PATH",
+        help=f"record per-stage and per-page timings as a Chrome trace (default {TRACE_PATH}) and print a summary",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="fail the build when an internal link, image or #anchor points nowhere",
+    )
+    parser.add_argument("--link-graph", metavar="PATH", help="write the site's link graph as JSON")
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="reference static files by content-hashed names so they can be cached forever",
+    )
+    parser.add_argument(
+        "--deploy-manifest",
+        nargs="?",
+        const=DEPLOY_MANIFEST_PATH,
+        metavar="PATH",
+        help=f"write output path -> sha256 for every deployable file (default {DEPLOY_MANIFEST_PATH}; implied by --fingerprint)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br/.zst when the codec is installed) next to HTML, CSS, JS and SVG outputs",
+    )
+    parser.add_argument(
+        "--precompress-min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        metavar="BYTES",
+        help="leave smaller files uncompressed",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="drop insignificant whitespace, comments and optional end tags from pages (<pre>/<code> untouched)",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="public origin such as https://example.com; enables sitemap.xml and the Atom feed.xml",
+    )
+    parser.add_argument(
+        "--image-dimensions",
+        action="store_true",
+        help=f"give <img> tags for images under {SRC_DIR}/ their width and height, plus loading=lazy and decoding=async",
+    )
+    parser.add_argument(
+        "--priority-image",
+        action="store_true",
+        help="with --image-dimensions, load each page's first image eagerly with fetchpriority=high",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help=f"write a sharded full-text index of the pages to {DST_DIR}/{SEARCH_DIR}/ for client-side search",
+    )
+    parser.add_argument(
+        "--search-memory",
+        type=int,
+        default=DEFAULT_MEMORY_MB,
+        metavar="MB",
+        help="spill pending index postings to disk beyond roughly this much memory",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_argument,
+        metavar="I/N",
+        help="render only the I-th of N stable slices of the pages, for combining later with the merge command",
+    )
+    add_listing_arguments(parser)
+    add_drafts_argument(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    args = finish_args(parser.parse_args(argv))
+    if args.shard is not None and (args.search_index or args.check_links or args.link_graph or args.deploy_manifest):
+        parser.error("--search-index, --check-links, --link-graph and --deploy-manifest need the whole site; pass them to merge instead")
+    return args
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve it locally.")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--watch", action="store_true", help="rebuild changed pages and reload open browser tabs")
+    parser.add_argument("--interval", type=float, default=0.3, help="seconds between polls for changes")
+    add_listing_arguments(parser)
+    add_drafts_argument(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    return finish_args(parser.parse_args(argv))
+
+def parse_render_server_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py render-server",
+        description="Render markdown from JSONL requests on stdin (or a unix socket) until EOF.",
+    )
+    parser.add_argument("--socket", metavar="PATH", help="listen on a unix socket instead of stdin/stdout")
+    parser.add_argument("--template-dir", default=".", metavar="DIR", help="directory that request template names resolve against")
+    return parser.parse_args(argv)
+
+def parse_merge_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description=f"Combine the {DST_DIR}/ trees and manifests of shard builds into {DST_DIR}/.",
+    )
+    parser.add_argument(
+        "shards",
+        nargs="+",
+        metavar="SHARD_DIR",
+        help=f"a shard's working directory, holding its {DST_DIR}/ and {MANIFEST_PATH}",
+    )
+    parser.add_argument("--check-links", action="store_true", help="fail when an internal link, image or #anchor points nowhere")
+    parser.add_argument("--link-graph", metavar="PATH", help="write the site's link graph as JSON")
+    parser.add_argument("--site-url", metavar="URL", help="public origin; enables sitemap.xml and the Atom feed.xml")
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="compress the merged site; variants the shards already wrote are kept",
+    )
+    parser.add_argument("--precompress-min-size", type=int, default=DEFAULT_MIN_SIZE, metavar="BYTES")
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help=f"index the merged pages into {DST_DIR}/{SEARCH_DIR}/; every page is parsed again",
+    )
+    parser.add_argument("--search-memory", type=int, default=DEFAULT_MEMORY_MB, metavar="MB")
+    parser.add_argument(
+        "--deploy-manifest",
+        nargs="?",
+        const=DEPLOY_MANIFEST_PATH,
+        metavar="PATH",
+        help=f"write output path -> sha256 for every deployable file (default {DEPLOY_MANIFEST_PATH}; implied when the shards fingerprinted)",
+    )
+    add_listing_arguments(parser)
+    return parser.parse_args(argv)
+
+def shard_argument(text):
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def parse_cache_server_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py cache-server",
+        description="Serve a build cache directory over HTTP for --build-cache http://... to use.",
+    )
+    parser.add_argument("--dir", default=BUILD_CACHE_DIR, help=f"directory holding the entries (default {BUILD_CACHE_DIR})")
+    parser.add_argument("--port", type=int, default=8890)
+    parser.add_argument("--host", default="127.0.0.1")
+    return parser.parse_args(argv)
+
+def add_cache_arguments(parser):
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=CACHE_DIR,
+        metavar="DIR",
+        help=f"reuse parsed markdown for unchanged sources from DIR (default {CACHE_DIR})",
+    )
+    parser.add_argument("--cache-size", type=int, default=256, metavar="MB", help="evict least recently used entries beyond this size")
+    parser.add_argument(
+        "--fragment-cache",
+        nargs="?",
+        type=int,
+        const=DEFAULT_MAX_ENTRIES,
+        metavar="ENTRIES",
+        help=f"render blocks repeated across pages, and partials, once per build (default {DEFAULT_MAX_ENTRIES} entries)",
+    )
+    parser.add_argument(
+        "--build-cache",
+        nargs="?",
+        const=BUILD_CACHE_DIR,
+        metavar="DIR_OR_URL",
+        help=f"restore finished pages from, and store new ones in, a directory CI can save (default {BUILD_CACHE_DIR}) or an http:// cache server",
+    )
+
+def add_listing_arguments(parser):
+    parser.add_argument(
+        "--section",
+        default=DEFAULT_SECTION,
+        help=f"content directory whose pages get a paginated listing and the feed (default {DEFAULT_SECTION})",
+    )
+    parser.add_argument("--per-page", type=int, default=DEFAULT_PER_PAGE, metavar="N", help="posts per listing page")
+
+def add_drafts_argument(parser):
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also render pages marked draft: true or dated in the future",
+    )
+
+def add_jobs_argument(parser):
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render pages in a pool of N processes (0 uses every CPU)",
+    )
+
+def finish_args(args):
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+def build(
+    basepath="/",
+    incremental=False,
+    jobs=1,
+    manifest=None,
+    link=False,
+    cache=None,
+    check_links=False,
+    link_graph=None,
+    fingerprint=False,
+    deploy_manifest=None,
+    precompress_min_size=None,
+    minify=False,
+    fragment_entries=None,
+    drafts=False,
+    site_url=None,
+    section=DEFAULT_SECTION,
+    per_page=DEFAULT_PER_PAGE,
+    search_memory=None,
+    shard=None,
+    build_cache=None,
+    images=None,
+):
+    # One scan of static/ serves every stage below, and each FileEntry
+    # stats its file at most once.
+    static_files = scan_tree(SRC_DIR) if owns_site_files(shard) or fingerprint else []
+    static_rels = [entry.rel for entry in static_files]
+    snapshot = None
+    if incremental:
+        if manifest is None:
+            with span("load_manifest"):
+                manifest = load_manifest(MANIFEST_PATH)
+        snapshot = manifest_snapshot(manifest)
+        os.makedirs(DST_DIR, exist_ok=True)
+    else:
+        # Pages and every derived file are rebuilt from scratch; copies of
+        # static files that still exist are kept for sync_static to check.
+        clear_output(DST_DIR, static_rels if owns_site_files(shard) else ())
+    if shard is not None:
+        # The merge step works from the shard's manifest, so there always is one.
+        if manifest is None:
+            manifest = new_manifest()
+        manifest["shard"] = list(shard)
+    
+    if owns_site_files(shard):
+        with span("sync_static"):
+            sync_static(SRC_DIR, DST_DIR, manifest, link, entries=static_files)
+    
+    assets = None
+    originals = ()
+    if fingerprint:
+        with span("fingerprint_assets"):
+            if owns_site_files(shard):
+                fingerprints = fingerprint_assets(DST_DIR, static_rels, manifest)
+            else:
+                fingerprints = fingerprint_names(SRC_DIR, static_rels)
+        assets = asset_urls(fingerprints, basepath)
+        originals = plain_originals(fingerprints)
+        deploy_manifest = deploy_manifest or DEPLOY_MANIFEST_PATH
+    
+    fragments = FragmentCache(fragment_entries) if fragment_entries else None
+    indexer = None
+    if search_memory is not None:
+        state = manifest.get("search") if manifest is not None else None
+        indexer = SearchIndexer(DST_DIR, state, search_memory * 1024 * 1024)
+    with span("generate_pages_recursive"):
+        pages = generate_pages_recursive(
+            basepath,
+            CONTENT_DIR,
+            TEMPLATE_PATH,
+            DST_DIR,
+            manifest,
+            jobs=jobs,
+            cache=cache,
+            assets=assets,
+            minify=minify,
+            fragments=fragments,
+            drafts=drafts,
+            indexer=indexer,
+            shard=shard,
+            build_cache=build_cache,
+            images=images,
+        )
+    if fragments is not None:
+        print(fragments.summary())
+    if build_cache is not None:
+        build_cache.close()
+        print(build_cache.summary())
+    
+    if indexer is not None:
+        with span("search_index"):
+            indexer.backfill(pages, cache)
+            state = indexer.finish(pages)
+        if manifest is not None:
+            manifest["search"] = state
+    elif manifest is not None and manifest.pop("search", None) is not None:
+        # Nothing keeps the old index current any more.
+        remove_search_index(DST_DIR)
+    
+    if shard is None:
+        # Listings, the sitemap and the feed span every shard; merge writes them.
+        with span("site_index"):
+            listings = write_site_index(
+                pages, DST_DIR, basepath, TEMPLATE_PATH, site_url, section, per_page, manifest, assets, minify
+            )
+        pages.update(listings)
+    
+    if precompress_min_size is not None:
+        with span("precompress"):
+            precompress(DST_DIR, precompress_min_size, jobs if jobs > 1 else None, originals)
+    
+    if deploy_manifest and shard is None:
+        with span("deploy_manifest"):
+            write_deploy_manifest(deploy_manifest, DST_DIR, deploy_exclusions(originals))
+    
+    if cache is not None:
+        with span("parse_cache_prune"):
+            cache.prune()
+    
+    if manifest is not None and (snapshot is None or manifest_changed(manifest, snapshot)):
+        with span("save_manifest"):
+            save_manifest(MANIFEST_PATH, manifest)
+    
+    if check_links or link_graph:
+        with span("check_links"):
+            validate_links(pages, check_links, link_graph, manifest, cache, static_rels)
+    return manifest
+
+def plain_originals(fingerprints):
+    # Plain-named originals are only kept for differential syncing;
+    # fingerprinted builds never reference them, so they are neither
+    # compressed nor uploaded.
+    return [rel.replace(os.sep, "/") for rel in fingerprints]
+
+def deploy_exclusions(originals):
+    return list(originals) + [rel + ext for rel in originals for ext in VARIANT_EXTENSIONS]
+
+def merge_site(args):
+    manifest = merge_shards(args.shards, DST_DIR, DST_DIR, MANIFEST_PATH)
+    entries = manifest["pages"].values()
+    basepath = next((entry["basepath"] for entry in entries), "/")
+    minify = any(entry["minify"] for entry in entries)
+    pages = {dst: (entry["source"], PageInfo.from_dict(entry.get("info", {}))) for dst, entry in manifest["pages"].items()}
+    fingerprints = {rel: entry["name"] for rel, entry in manifest.get("fingerprints", {}).items()}
+    assets = asset_urls(fingerprints, basepath) if fingerprints else None
+    
+    if args.search_index:
+        # Shards never index and the merge starts from an empty tree, so
+        # every page is indexed from its source.
+        indexer = SearchIndexer(DST_DIR, None, args.search_memory * 1024 * 1024)
+        indexer.backfill(pages)
+        manifest["search"] = indexer.finish(pages)
+    
+    listings = write_site_index(
+        pages, DST_DIR, basepath, TEMPLATE_PATH, args.site_url, args.section, args.per_page, manifest, assets, minify
+    )
+    pages.update(listings)
+    originals = plain_originals(fingerprints)
+    if args.precompress:
+        precompress(DST_DIR, args.precompress_min_size, exclude=originals)
+    deploy_manifest = args.deploy_manifest or (DEPLOY_MANIFEST_PATH if fingerprints else None)
+    if deploy_manifest:
+        write_deploy_manifest(deploy_manifest, DST_DIR, deploy_exclusions(originals))
+    save_manifest(MANIFEST_PATH, manifest)
+    if args.check_links or args.link_graph:
+        validate_links(pages, args.check_links, args.link_graph, manifest)
+
+def validate_links(pages, check_links, link_graph, manifest=None, cache=None, static_rels=None):
+    if manifest is not None:
+        # Pages skipped by this build carry no links; the sidecar or a
+        # fresh parse of their sources supplies them.
+        records = load_link_records(LINKS_PATH)
+        if fill_links(pages, manifest["pages"], records, cache):
+            save_link_records(LINKS_PATH, records)
+    if static_rels is None:
+        static_rels = list_files(SRC_DIR)
+    index = build_link_index(pages, DST_DIR, static_rels)
+    if link_graph:
+        index.write_graph(link_graph)
+        print(f"Wrote link graph to {link_graph}")
+    if check_links:
+        broken = index.validate()
+        for link in broken:
+            print(link)
+        if broken:
+            raise BrokenLinksError(f"{len(broken)} broken link(s)")
+        print(f"Checked links across {len(pages)} page(s): none broken")
+
+def serve_site(args):
+    state = {"manifest": None}
+    
+    def rebuild():
+        state["manifest"] = build(
+            "/",
+            True,
+            args.jobs,
+            state["manifest"],
+            cache=make_cache(args),
+            fragment_entries=args.fragment_cache,
+            drafts=args.drafts,
+            build_cache=make_build_cache(args),
+            section=args.section,
+            per_page=args.per_page,
+        )
+    
+    rebuild()
+    # Pages may pick any template next to the default one in their front matter.
+    template_dir = os.path.dirname(TEMPLATE_PATH) or "."
+    templates = sorted(os.path.join(template_dir, name) for name in os.listdir(template_dir) if name.endswith(".html"))
+    watch_paths = [CONTENT_DIR, SRC_DIR] + templates if args.watch else None
+    serve(DST_DIR, args.port, rebuild, watch_paths, args.interval)
+
+def make_cache(args):
+    if args.cache is None:
+        return None
+    return ParseCache(args.cache, args.cache_size * 1024 * 1024)
+
+def make_build_cache(args):
+    if args.build_cache is None:
+        return None
+    return BuildCache(open_store(args.build_cache))
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        serve_site(parse_serve_args(argv[1:]))
+        return
+    if argv and argv[0] == "render-server":
+        args = parse_render_server_args(argv[1:])
+        serve_render(args.template_dir, args.socket)
+        return
+    if argv and argv[0] == "cache-server":
+        args = parse_cache_server_args(argv[1:])
+        serve_build_cache(args.dir, args.port, args.host)
+        return
+    if argv and argv[0] == "merge":
+        try:
+            merge_site(parse_merge_args(argv[1:]))
+        except (MergeError, BrokenLinksError) as e:
+            print(e)
+            sys.exit(1)
+        return
+    args = parse_args(argv)
+    if args.profile:
+        profiling.enable()
+    try:
+        with span("build"):
+            build(
+                args.basepath,
+                args.incremental,
+                args.jobs,
+                link=args.link,
+                cache=make_cache(args),
+                check_links=args.check_links,
+                link_graph=args.link_graph,
+                fingerprint=args.fingerprint,
+                deploy_manifest=args.deploy_manifest,
+                precompress_min_size=args.precompress_min_size if args.precompress else None,
+                minify=args.minify,
+                fragment_entries=args.fragment_cache,
+                drafts=args.drafts,
+                site_url=args.site_url,
+                section=args.section,
+                per_page=args.per_page,
+                search_memory=args.search_memory if args.search_index else None,
+                shard=args.shard,
+                build_cache=make_build_cache(args),
+                images=ImageSizes(SRC_DIR, args.priority_image) if args.image_dimensions else None,
+            )
+    except BrokenLinksError as e:
+        print(e)
+        sys.exit(1)
+    if args.profile:
+        events = profiling.disable()
+        profiling.write_trace(args.profile, events)
+        print(profiling.summarize(events))
+        print(f"Wrote trace to {args.profile}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+
+GENERATOR_VERSION = "8"
+MANIFEST_PATH = os.path.join(".ssg", "manifest.json")
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def files_hash(paths):
+    if len(paths) == 1:
+        return file_hash(paths[0])
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(file_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+def new_manifest():
+    return {"version": GENERATOR_VERSION, "pages": {}, "assets": []}
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return new_manifest()
+    if not isinstance(manifest, dict) or manifest.get("version") != GENERATOR_VERSION:
+        return new_manifest()
+    manifest.setdefault("pages", {})
+    manifest.setdefault("assets", [])
+    return manifest
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # One dumps call without indent is what gets json's C encoder; dump
+        # and indent both fall back to the pure-Python one, which is several
+        # times slower on a large site's manifest.
+        f.write(json.dumps(manifest, sort_keys=True, separators=(",", ":")))
+    os.replace(tmp_path, path)
+
+def _rest_json(manifest):
+    return json.dumps({key: value for key, value in manifest.items() if key != "pages"}, sort_keys=True)
+
+def manifest_snapshot(manifest):
+    # Page entries are replaced, never edited in place, so a shallow copy of
+    # the pages is enough to compare against; everything else is small.
+    return dict(manifest["pages"]), _rest_json(manifest)
+
+def manifest_changed(manifest, snapshot):
+    pages, rest = snapshot
+    return manifest["pages"] != pages or _rest_json(manifest) != rest
+
+def source_hash(entry, path, st):
+    # Reuse the recorded hash while size and mtime are unchanged, so an
+    # incremental run only reads the files that were actually touched.
+    if entry is not None and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return entry["source_hash"]
+    return file_hash(path)
+
+def recorded_meta(entry, path, st):
+    # The front matter recorded for a source whose size and mtime are
+    # unchanged, like source_hash, or None when it has to be read.
+    if entry is not None and entry.get("source") == path and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return entry.get("meta")
+    return None
+
+def includes_hash(paths):
+    if not paths:
+        return None
+    try:
+        return files_hash(paths)
+    except OSError:
+        # A deleted partial must never compare equal to the recorded hash.
+        return "missing"
+
+def page_entry(src, st, src_hash, template_hash, basepath, assets_hash=None, minify=False, includes_hash=None, images_hash=None):
+    return {
+        "source": src,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "source_hash": src_hash,
+        "template_hash": template_hash,
+        "basepath": basepath,
+        "assets_hash": assets_hash,
+        "minify": minify,
+        "includes_hash": includes_hash,
+        "images_hash": images_hash,
+        "generator": GENERATOR_VERSION,
+    }
+
+def is_fresh(entry, new_entry, dest_path):
+    if entry is None or not os.path.exists(dest_path):
+        return False
+    for key in ("source", "source_hash", "template_hash", "basepath", "assets_hash", "minify", "includes_hash", "images_hash", "generator"):
+        if entry.get(key) != new_entry[key]:
+            return False
+    return True
\ No newline at end of file
@@ -1,8 +1,23 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from collections import namedtuple
 from enum import Enum
+import io
 import os
-from textnode import text_node_to_html_node
-from htmlnode import LeafNode, ParentNode
-from split_nodes_delimiter import text_to_textnodes
+import re
+import sys
+from textnode import TextType, text_node_to_html_node
+from htmlnode import FragmentNode, LeafNode, ParentNode
+from split_nodes_delimiter import text_to_textnodes, has_inline_markup
+from template import load_template
+from profiling import span
+import profiling
+from manifest import file_hash, files_hash, includes_hash, source_hash, page_entry, is_fresh, recorded_meta
+from fragment_cache import FragmentCache
+from front_matter import is_published, read_front_matter, split_front_matter
+from fingerprint import UrlRewriter, urls_hash
+from shard import select_shard
+from discovery import is_hidden, scan_tree
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -12,24 +27,122 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def block_to_block_type(block):
-    lines = block.splitlines()
+# Shared tag strings, so heading nodes do not each carry a fresh f"h{n}" copy.
+HEADING_TAGS = (None, "h1", "h2", "h3", "h4", "h5", "h6")
+
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_SPACE = re.compile(r"[\s_]+")
+SUMMARY_LENGTH = 280
+
+# A paragraph that is nothing but {% include "path" %} splices in a partial.
+_INCLUDE = re.compile(r"""\{%\s*include\s+["']([^"']+)["']\s*%\}$""")
+
+_WORD = re.compile(r"\w+")
+MAX_TERM_LENGTH = 32
+
+Block = namedtuple("Block", ["type", "lines", "start", "end"])
+# Everything besides the source and template that changes how a page is
+# rendered; terms fills PageInfo.terms for the search index.
+RenderOptions = namedtuple(
+    "RenderOptions",
+    ["cache", "assets", "minify", "fragments", "images", "terms"],
+    defaults=(None, None, False, None, None, False),
+)
+
+class PageInfo:
+    __slots__ = ("title", "date", "tags", "summary", "links", "anchors", "includes", "terms")
+    
+    def __init__(self):
+        self.title = None
+        # Plain text of the first paragraph that is more than a link or image.
+        self.summary = None
+        # From front matter: ISO date string and list of tags.
+        self.date = None
+        self.tags = []
+        # (kind, target, line) for every link and image in the page. Both are
+        # None for a skipped page rebuilt from its manifest record, which
+        # leaves them out; linkcheck.fill_links supplies them when needed.
+        self.links = []
+        self.anchors = []
+        # Partial files spliced into the page, nested ones included.
+        self.includes = []
+        # {term: count} over the page text, for the search index. Handed
+        # straight to the indexer and never written to the manifest.
+        self.terms = None
+    
+    def to_dict(self, links=True):
+        # links=False gives the manifest record: what listings and change
+        # detection need, with only the image URLs standing in for links.
+        data = {
+            "title": self.title,
+            "date": self.date,
+            "tags": list(self.tags),
+            "summary": self.summary,
+            "includes": list(self.includes),
+        }
+        if links:
+            data["links"] = [list(link) for link in self.links]
+            data["anchors"] = list(self.anchors)
+        else:
+            data["images"] = self.image_urls()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        info = cls.__new__(cls)
+        info._load(data)
+        return info
+    
+    def _load(self, data):
+        self.title = data.get("title")
+        self.date = data.get("date")
+        self.tags = list(data.get("tags", ()))
+        self.summary = data.get("summary")
+        if "links" in data:
+            self.links = [tuple(link) for link in data["links"]]
+            self.anchors = list(data.get("anchors", ()))
+        else:
+            self.links = self.anchors = None
+        self.includes = list(data.get("includes", ()))
+        self.terms = None
+    
+    def image_urls(self):
+        return [target for kind, target, line in self.links if kind == "image"]
+
+class RecordedPageInfo(PageInfo):
+    # The PageInfo of a page an incremental build skipped, read from its
+    # manifest record only when something first looks at it.
+    __slots__ = ("record",)
+    
+    def __init__(self, record):
+        self.record = record
+    
+    def __getattr__(self, name):
+        # Only reached while the PageInfo slots are still unset.
+        if name not in PageInfo.__slots__:
+            raise AttributeError(name)
+        self._load(self.record)
+        return getattr(self, name)
+
+def is_fence(line):
+    s = line.strip()
+    return s.startswith("```") and "`" not in s[3:]
+
+def lines_to_block_type(lines):
+    first = lines[0] if lines else ""
     num = 0
+    while num < len(first) and first[num] == "#":
+        num += 1
+    if 1 <= num <= 6 and num < len(first) and first[num] == " ":
+        return BlockType.HEADING
+    
     start = 0
     end = len(lines)
-    
     while start < end and lines[start] == "":
         start += 1
     while end > start and lines[end-1].strip() == "":
         end -= 1
-    trimmed = lines[start:end]
-    
-    while num < len(block) and block[num] == "#":
-        num += 1
-    if 1 <= num <= 6 and num < len(block) and block[num] == " ":
-        return BlockType.HEADING
-    
-    if len(trimmed) >= 2 and trimmed[0].strip() == "```" and trimmed[-1].strip() == "```":
+    if end - start >= 2 and is_fence(lines[start]) and lines[end-1].strip() == "```":
         return BlockType.CODE
     
     if all(line.strip().startswith(">") for line in lines if line.strip() != ""):
@@ -43,92 +156,274 @@ def block_to_block_type(block):
     
     return BlockType.PARAGRAPH
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
+def block_to_block_type(block):
+    return lines_to_block_type(block.splitlines())
+
+def _finish_block(lines, start, end, block_type=None, typed=True):
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    if block_type is None and typed:
+        block_type = lines_to_block_type(lines)
+    return Block(block_type, lines, start, end)
+
+def iter_blocks(lines, typed=True):
+    # Single pass over an iterable of lines (a file object works), yielding
+    # each block with its 1-based line range as soon as it is complete.
+    # Fenced code runs to its closing fence, blank lines included. With
+    # typed=False the blocks are not classified and their type is None.
+    block = []
+    start = 0
+    fenced = False
+    lineno = 0
+    for lineno, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if fenced:
+            block.append(line)
+            if line.strip() == "```":
+                yield _finish_block(block, start, lineno, BlockType.CODE)
+                block = []
+                fenced = False
             continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
-
-def markdown_to_html_node(markdown):
-    markdown = markdown_to_blocks(markdown)
-    container = ParentNode("div", [])
-    for block in markdown:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.PARAGRAPH:
-            lines = [line.strip() for line in block.splitlines() if line.strip() != ""]
-            text = " ".join(lines)
-            nodes = text_to_textnodes(text)
-            html_children = [text_node_to_html_node(n) for n in nodes]
-            container.children.append(ParentNode("p", html_children))
-        
-        elif block_type == BlockType.HEADING:
-            num = 0
-            while num < len(block) and block[num] == "#":
-                num += 1
-            text = block[num:].lstrip()
-            nodes = text_to_textnodes(text)
-            html_children = [text_node_to_html_node(n) for n in nodes]
-            container.children.append(ParentNode(f"h{num}", html_children))
-        
-        elif block_type == BlockType.CODE:
-            lines = block.splitlines()
-            text = "\n".join(lines[1:-1]) + "\n"
-            children = LeafNode(None, text)
-            node = ParentNode("code", [children])
-            container.children.append(ParentNode("pre", [node]))
-        
-        elif block_type == BlockType.QUOTE:
-            parts = []
-            for l in block.splitlines():
-                s = l.strip()
-                if not s:
-                    continue
-                if s.startswith(">"):
+        if line.strip() == "":
+            if block:
+                yield _finish_block(block, start, lineno - 1, None, typed)
+                block = []
+            continue
+        if not block:
+            start = lineno
+            fenced = is_fence(line)
+        block.append(line)
+    if block:
+        yield _finish_block(block, start, lineno, None, typed)
+
+def markdown_to_blocks(markdown):
+    return ["\n".join(block.lines) for block in iter_blocks(markdown.splitlines(), typed=False)]
+
+def text_to_children(text, links=None, words=None):
+    children = []
+    for node in text_to_textnodes(text):
+        if words is not None:
+            words.append(node.text)
+        if links is not None and (node.text_type == TextType.LINK or node.text_type == TextType.IMAGE):
+            links.append((node.text_type.value, node.url))
+        if node.text_type == TextType.LINK and has_inline_markup(node.text):
+            children.append(ParentNode("a", text_to_children(node.text), {"href": node.url}))
+        else:
+            children.append(text_node_to_html_node(node))
+    return children
+
+def plain_text(node):
+    parts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children is None:
+            parts.append(node.value or "")
+        else:
+            stack.extend(reversed(node.children))
+    return "".join(parts)
+
+def paragraph_summary(node, limit=SUMMARY_LENGTH):
+    # Paragraphs that only hold links or images (a "< Back Home" link, a
+    # hero image) say nothing about the page, so they are passed over.
+    if all(child.tag in ("a", "img") or (child.tag is None and not child.value.strip()) for child in node.children):
+        return None
+    text = " ".join(plain_text(node).split())
+    if len(text) > limit:
+        text = text[:limit].rsplit(" ", 1)[0] + "…"
+    return text or None
+
+def heading_slug(text, seen):
+    slug = _SLUG_STRIP.sub("", text.lower()).strip()
+    slug = _SLUG_SPACE.sub("-", slug) or "section"
+    unique = slug
+    n = 1
+    while unique in seen:
+        unique = f"{slug}-{n}"
+        n += 1
+    seen.add(unique)
+    return unique
+
+def heading_level(line):
+    num = 0
+    while num < len(line) and line[num] == "#":
+        num += 1
+    return num
+
+def block_to_html_node(block, links=None, words=None):
+    block_type = block.type
+    lines = block.lines
+    
+    if block_type == BlockType.PARAGRAPH:
+        text = " ".join([line.strip() for line in lines if line.strip() != ""])
+        return ParentNode("p", text_to_children(text, links, words))
+    
+    if block_type == BlockType.HEADING:
+        num = heading_level(lines[0])
+        text = "\n".join(lines)[num:].lstrip()
+        return ParentNode(HEADING_TAGS[num], text_to_children(text, links, words))
+    
+    if block_type == BlockType.CODE:
+        text = "\n".join(lines[1:-1]) + "\n"
+        return ParentNode("pre", [ParentNode("code", [LeafNode(None, text)])])
+    
+    if block_type == BlockType.QUOTE:
+        parts = []
+        for l in lines:
+            s = l.strip()
+            if not s:
+                continue
+            if s.startswith(">"):
+                s = s[1:]
+                if s.startswith(" "):
                     s = s[1:]
-                    if s.startswith(" "):
-                        s = s[1:]
-                    if s == "":
-                        continue
-                    parts.append(s)
-                else:
-                    parts.append(l.strip())
-            text = " ".join(parts)
-            nodes = text_to_textnodes(text)
-            html_children = [text_node_to_html_node(n) for n in nodes]
-            container.children.append(ParentNode("blockquote", html_children))
-        
-        elif block_type == BlockType.UNORDERED_LIST:
-            lines = [line for line in block.splitlines() if line.strip()]
-            list_nodes = []
-            for line in lines:
-                if line.startswith("- "):
-                    item_text = line[2:]
-                else:
-                    continue
-                nodes = text_to_textnodes(item_text)
-                children = [text_node_to_html_node(n) for n in nodes]
-                list_nodes.append(ParentNode("li", children))
-            container.children.append(ParentNode("ul", list_nodes))
-        
-        elif block_type == BlockType.ORDERED_LIST:
-            lines = [line for line in block.splitlines() if line.strip()]
-            list_nodes = []
-            for idx, line in enumerate(lines, start=1):
-                prefix = f"{idx}. "
-                if line.startswith(prefix):
-                    item_text = line[len(prefix):]
-                else:
+                if s == "":
                     continue
-                nodes = text_to_textnodes(item_text)
-                children = [text_node_to_html_node(n) for n in nodes]
-                list_nodes.append(ParentNode("li", children))
-            container.children.append(ParentNode("ol", list_nodes))
-    return container
+                parts.append(s)
+            else:
+                parts.append(s)
+        return ParentNode("blockquote", text_to_children(" ".join(parts), links, words))
+    
+    if block_type == BlockType.UNORDERED_LIST:
+        list_nodes = []
+        for line in lines:
+            if line.startswith("- "):
+                list_nodes.append(ParentNode("li", text_to_children(line[2:], links, words)))
+        return ParentNode("ul", list_nodes)
+    
+    list_nodes = []
+    for idx, line in enumerate(lines, start=1):
+        prefix = f"{idx}. "
+        if line.startswith(prefix):
+            list_nodes.append(ParentNode("li", text_to_children(line[len(prefix):], links, words)))
+    return ParentNode("ol", list_nodes)
+
+def link_lines(block, found):
+    # found is in document order, so each search resumes where the previous
+    # link ended and repeated targets get their own lines.
+    lines = []
+    offset = column = 0
+    for kind, target in found:
+        needle = f"]({target})"
+        for i in range(offset, len(block.lines)):
+            at = block.lines[i].find(needle, column if i == offset else 0)
+            if at != -1:
+                offset, column = i, at + len(needle)
+                break
+        lines.append((kind, target, block.start + offset))
+    return lines
+
+def markdown_to_html_node(markdown, info=None, heading_ids=False, fragments=None, base_dir=None, terms=False):
+    # base_dir enables {% include %} partials, resolved relative to it; terms
+    # fills info.terms for the search index, which costs a tokenizing pass.
+    with span("markdown_to_html_node"):
+        return _markdown_to_html_node(markdown, info, heading_ids, fragments, base_dir, frozenset(), terms)
+
+def _markdown_to_html_node(markdown, info, heading_ids, fragments, base_dir, including, terms):
+    # Accepts the markdown as a string or as an open file, which is read
+    # line by line instead of being loaded whole.
+    lines = markdown.splitlines() if isinstance(markdown, str) else markdown
+    children = []
+    found = [] if info is not None else None
+    words = [] if info is not None and terms else None
+    partial_terms = []
+    seen = set()
+    for block in iter_blocks(lines):
+        include = include_target(block) if base_dir is not None else None
+        if include is not None:
+            path = os.path.normpath(os.path.join(base_dir, include))
+            nodes, partial = render_partial(path, heading_ids, fragments, including, terms)
+            children.extend(nodes)
+            if info is not None:
+                # Links inside a partial are reported at the include line.
+                info.links.extend((kind, target, block.start) for kind, target, line in partial.links)
+                info.anchors.extend(partial.anchors)
+                info.includes.append(path)
+                info.includes.extend(partial.includes)
+                if terms:
+                    partial_terms.append(partial.terms)
+            continue
+        if fragments is not None and block.type != BlockType.HEADING:
+            node, block_links, block_words = cached_block(block, fragments, terms)
+            children.append(node)
+            if info is not None:
+                if words is not None:
+                    words.extend(block_words)
+                info.links.extend((kind, target, block.start + offset) for kind, target, offset in block_links)
+                if info.summary is None and block.type == BlockType.PARAGRAPH:
+                    info.summary = paragraph_summary(node)
+            continue
+        node = block_to_html_node(block, found, words)
+        children.append(node)
+        if info is not None and info.summary is None and block.type == BlockType.PARAGRAPH:
+            info.summary = paragraph_summary(node)
+        if block.type == BlockType.HEADING:
+            if heading_ids:
+                node.props = {"id": heading_slug(plain_text(node), seen)}
+                if info is not None:
+                    info.anchors.append(node.props["id"])
+            if info is not None and info.title is None and heading_level(block.lines[0]) == 1:
+                info.title = block.lines[0][1:].strip()
+        if found:
+            info.links.extend(link_lines(block, found))
+            found.clear()
+    if words is not None:
+        info.terms = page_terms(words, partial_terms)
+    return ParentNode("div", children)
+
+def page_terms(words, extra=()):
+    # Tokenized from the same TextNode stream the page was rendered from, so
+    # markup never leaks into the index; code blocks are left out.
+    terms = {}
+    for term in _WORD.findall(" ".join(words).lower()):
+        if 1 < len(term) <= MAX_TERM_LENGTH:
+            terms[term] = terms.get(term, 0) + 1
+    for more in extra:
+        for term, count in more.items():
+            terms[term] = terms.get(term, 0) + count
+    return terms
+
+def include_target(block):
+    if block.type != BlockType.PARAGRAPH or len(block.lines) != 1:
+        return None
+    match = _INCLUDE.match(block.lines[0].strip())
+    return match.group(1) if match else None
+
+def cached_block(block, fragments, terms=False):
+    # Headings are never shared: their ids depend on the rest of the page.
+    key = (block.type, "\n".join(block.lines), terms)
+    hit = fragments.get(key)
+    if hit is not None:
+        return hit
+    found = []
+    words = [] if terms else None
+    node = block_to_html_node(block, found, words)
+    value = (
+        FragmentNode(node.tag, node.children, node.props),
+        [(kind, target, line - block.start) for kind, target, line in link_lines(block, found)],
+        words,
+    )
+    fragments.put(key, value)
+    return value
+
+def render_partial(path, heading_ids=False, fragments=None, including=frozenset(), terms=False):
+    # Returns (nodes, PageInfo); with a fragment cache each partial is parsed
+    # and serialized once per build no matter how many pages include it.
+    if path in including:
+        raise ValueError(f"{path}: recursive include")
+    key = (path, heading_ids, terms)
+    if fragments is not None:
+        fragments.partial_uses += 1
+        if key in fragments.partials:
+            return fragments.partials[key]
+    info = PageInfo()
+    with open(path, "r", encoding="utf-8") as f:
+        node = _markdown_to_html_node(f, info, heading_ids, fragments, os.path.dirname(path), including | {path}, terms)
+    nodes = node.children
+    if fragments is not None:
+        nodes = [child if isinstance(child, FragmentNode) else FragmentNode(child.tag, child.children, child.props) for child in nodes]
+        fragments.partials[key] = (nodes, info)
+    return nodes, info
 
 def extract_title(markdown):
     for line in markdown.splitlines():
@@ -141,33 +436,318 @@ def extract_title(markdown):
                 return s[hashes:].strip()
     raise Exception("No h1 header")
 
-def generate_page(basepath, from_path, template_path, dest_path):
+def parse_page(from_path, cache=None, fragments=None, terms=False):
+    # Returns (node, info, front matter); info.terms is only filled with terms.
+    if cache is None:
+        with open(from_path, "r", encoding="utf-8") as f:
+            return _parse_page(f, from_path, fragments, terms)
+    
+    with open(from_path, "rb") as f:
+        source = f.read()
+    key = cache.key(source, terms)
+    with span("parse_cache_get"):
+        hit = cache.get(key)
+    if hit is not None:
+        return hit
+    parsed = _parse_page(source.decode("utf-8").splitlines(), from_path, fragments, terms)
+    if parsed[1].includes:
+        # The key only covers this file, so a tree with partials spliced in
+        # could go stale; those pages are always parsed afresh.
+        return parsed
+    with span("parse_cache_put"):
+        cache.put(key, parsed)
+    return parsed
+
+def _parse_page(lines, from_path, fragments, terms):
+    try:
+        meta, body = split_front_matter(lines)
+    except ValueError as e:
+        raise ValueError(f"{from_path}: {e}") from None
+    info = PageInfo()
+    node = markdown_to_html_node(body, info, True, fragments, os.path.dirname(from_path), terms)
+    apply_front_matter(info, meta)
+    return node, info, meta
+
+def apply_front_matter(info, meta):
+    # Front matter wins over what the markdown itself implies.
+    if meta.get("title"):
+        info.title = str(meta["title"])
+    if meta.get("date"):
+        info.date = str(meta["date"])
+    if meta.get("summary"):
+        info.summary = str(meta["summary"])
+    tags = meta.get("tags") or []
+    info.tags = [str(tag) for tag in (tags if isinstance(tags, list) else [tags])]
+
+def page_template(meta, template_path):
+    # front matter "template: post.html" picks a sibling of the default template.
+    name = meta.get("template")
+    if not name:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), str(name))
+
+def generate_page(basepath, from_path, template_path, dest_path, options=RenderOptions()):
+    with span("generate_page", "page", {"path": from_path}):
+        return _generate_page(basepath, from_path, template_path, dest_path, options)
+
+def _generate_page(basepath, from_path, template_path, dest_path, options):
+    node, info, meta = parse_page(from_path, options.cache, options.fragments, options.terms)
+    template_path = page_template(meta, template_path)
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
     
-    with open(from_path, "r", encoding="utf-8") as f:
-        md = f.read()
+    with span("load_template"):
+        template = load_template(template_path, basepath, options.minify)
+    if info.title is None:
+        raise Exception("No h1 header")
+    title = info.title
     
-    with open(template_path, "r", encoding="utf-8") as f:
-        template = f.read()
+    # Stream the page straight into the output file rather than building it
+    # in memory; a temp file keeps failed pages off disk.
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+    try:
+        with span("render_and_write"):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                out = UrlRewriter(f, options.assets) if options.assets else f
+                if options.images is not None:
+                    # Outermost, so it still sees the unfingerprinted image URLs.
+                    out = options.images.writer(out, basepath)
+                template.render_to(out, {"Title": title, "Content": node, "Page": meta})
+            os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return info
+
+def _not_a_page(name):
+    # _partials/, _bio.md and the like are include-only, never pages.
+    return name.startswith("_") or is_hidden(name)
+
+def find_pages(dir_path_content, dest_dir_path, files=None):
+    # files, when given, is filled with {source_path: FileEntry} so later
+    # stages reuse the stat results of the scan.
+    pages = []
+    for entry in scan_tree(dir_path_content, _not_a_page):
+        if entry.rel.endswith(".md"):
+            src = entry.path
+            pages.append((src, os.path.join(dest_dir_path, entry.rel[:-3] + ".html")))
+            if files is not None:
+                files[src] = entry
+    return pages
+
+def remove_stale_pages(manifest, live, dest_dir_path):
+    for dest_path in sorted(set(manifest["pages"]) - live):
+        del manifest["pages"][dest_path]
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            print(f"Removed stale page {dest_path}")
+        parent = os.path.dirname(dest_path)
+        while parent and os.path.abspath(parent) != os.path.abspath(dest_dir_path):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+# Each pool worker keeps its own fragment cache; the pool, and with it the
+# cache, only lives for one build.
+_worker_fragments = None
+
+def _render_task(task):
+    global _worker_fragments
+    basepath, src, template_path, dst, options, fragment_entries, profile = task
+    fragments = None
+    if fragment_entries is not None:
+        if _worker_fragments is None:
+            _worker_fragments = FragmentCache(fragment_entries)
+        fragments = _worker_fragments
+        options = options._replace(fragments=fragments)
+    if profile:
+        profiling.enable()
+    out = io.StringIO()
+    info = None
+    error = None
+    try:
+        with redirect_stdout(out):
+            info = generate_page(basepath, src, template_path, dst, options)
+    except Exception as e:
+        error = e
+    stats = fragments.take_stats() if fragments is not None else None
+    return out.getvalue(), info, error, profiling.disable() if profile else [], stats
+
+def hand_off_terms(indexer, dest_path, info):
+    # Terms go to the indexer as each page finishes rather than piling up
+    # with every other PageInfo until the end of the build.
+    terms, info.terms = info.terms, None
+    if indexer is not None and terms is not None:
+        indexer.add(dest_path, terms)
+
+def page_done(dest_path, info, indexer, build_cache, keys, images):
+    if build_cache is not None:
+        build_cache.put(keys[dest_path], dest_path, info, images)
+    hand_off_terms(indexer, dest_path, info)
+
+def render_pages(basepath, pages, template_path, options, jobs=1, indexer=None, build_cache=None, keys=None):
+    # keys maps dest_path -> build cache key when a build cache is in use.
+    images = options.images
+    infos = {}
+    if build_cache is not None:
+        infos = build_cache.fetch(pages, keys, images)
+        for dst, info in infos.items():
+            hand_off_terms(indexer, dst, info)
+        pages = [(src, dst) for src, dst in pages if dst not in infos]
+    if jobs <= 1 or len(pages) <= 1:
+        for src, dst in pages:
+            infos[dst] = generate_page(basepath, src, template_path, dst, options)
+            page_done(dst, infos[dst], indexer, build_cache, keys, images)
+        return infos
     
-    html = markdown_to_html_node(md).to_html()
-    title = extract_title(md)
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", html).replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+    # Submit the biggest sources first so a single huge page does not start
+    # last, but report logs and errors in discovery order so output is stable.
+    order = sorted(range(len(pages)), key=lambda i: os.path.getsize(pages[i][0]), reverse=True)
+    futures = [None] * len(pages)
+    # Workers build their own fragment caches rather than receiving this one.
+    fragments = options.fragments
+    fragment_entries = fragments.max_entries if fragments is not None else None
+    worker_options = options._replace(fragments=None)
+    first_error = None
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for i in order:
+            src, dst = pages[i]
+            task = (basepath, src, template_path, dst, worker_options, fragment_entries, profiling.enabled())
+            futures[i] = pool.submit(_render_task, task)
+        for (src, dst), future in zip(pages, futures):
+            log, info, error, events, stats = future.result()
+            sys.stdout.write(log)
+            profiling.extend(events)
+            if stats is not None:
+                fragments.merge_stats(stats)
+            infos[dst] = info
+            if info is not None:
+                page_done(dst, info, indexer, build_cache, keys, images)
+            if error is not None and first_error is None:
+                first_error = error
+    if first_error is not None:
+        raise first_error
+    return infos
+
+def publishable_pages(pages, drafts=False, today=None, manifest=None, files=None):
+    # Only the front matter of each file is read, so drafts and future
+    # posts are dropped without their bodies ever being parsed; with a
+    # manifest, unchanged files are not even opened.
+    published = []
+    metas = {}
+    for src, dst in pages:
+        meta = None
+        if manifest is not None:
+            st = files[src].stat() if files is not None and src in files else os.stat(src)
+            meta = recorded_meta(manifest["pages"].get(dst), src, st)
+        if meta is None:
+            meta = read_front_matter(src)
+        try:
+            if not drafts and not is_published(meta, today):
+                continue
+        except ValueError as e:
+            raise ValueError(f"{src}: {e}") from None
+        metas[src] = meta
+        published.append((src, dst))
+    if len(published) < len(pages):
+        print(f"Skipped {len(pages) - len(published)} draft or future-dated page(s)")
+    return published, metas
+
+def template_hash(path, basepath, hashes):
+    if path not in hashes:
+        hashes[path] = files_hash(load_template(path, basepath).dependencies)
+    return hashes[path]
+
+def generate_pages_recursive(
+    basepath,
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    manifest=None,
+    *,
+    jobs=1,
+    cache=None,
+    assets=None,
+    minify=False,
+    fragments=None,
+    drafts=False,
+    indexer=None,
+    shard=None,
+    build_cache=None,
+    images=None,
+):
+    # Returns {dest_path: (source_path, PageInfo)} for every page of the site,
+    # or of the (index, count) shard of it, including pages an incremental
+    # build skipped.
+    files = {}
+    pages = find_pages(dir_path_content, dest_dir_path, files)
+    if shard is not None:
+        pages = select_shard(pages, shard, dir_path_content)
+    pages, metas = publishable_pages(pages, drafts, None, manifest, files)
+    options = RenderOptions(cache, assets, minify, fragments, images, indexer is not None)
+    template_hashes = {}
+    assets_hash = urls_hash(assets)
+    if manifest is None:
+        keys = None
+        if build_cache is not None:
+            keys = {}
+            for src, dst in pages:
+                path = page_template(metas[src], template_path)
+                keys[dst] = build_cache.key(
+                    file_hash(src),
+                    template_hash(path, basepath, template_hashes),
+                    basepath,
+                    assets_hash,
+                    minify,
+                    images,
+                    indexer is not None,
+                )
+        infos = render_pages(basepath, pages, template_path, options, jobs, indexer, build_cache, keys)
+        return {dst: (src, infos[dst]) for src, dst in pages}
     
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(page)
-
-def generate_pages_recursive(basepath, dir_path_content, template_path, dest_dir_path):
-    for dir_path in os.listdir(dir_path_content):
-        full_src = os.path.join(dir_path_content, dir_path)
-        if os.path.isfile(full_src):
-            if dir_path.endswith(".md"):
-                out_name = dir_path.rsplit(".md", 1)[0] + ".html"
-                dst_html = os.path.join(dest_dir_path, out_name)
-                generate_page(basepath, full_src, template_path, dst_html)
-        elif os.path.isdir(full_src):
-            dest_path = os.path.join(dest_dir_path, dir_path)
-            if not os.path.exists(dest_path):
-                os.makedirs(dest_path)
-            generate_pages_recursive(basepath, full_src, template_path, dest_path)
\ No newline at end of file
+    # Includes are inputs too, so editing a partial invalidates every page.
+    todo = []
+    entries = {}
+    for src, dst in pages:
+        path = page_template(metas[src], template_path)
+        st = files[src].stat()
+        entry = manifest["pages"].get(dst)
+        previous = entry.get("info", {}) if entry is not None else {}
+        entries[dst] = page_entry(
+            src,
+            st,
+            source_hash(entry, src, st),
+            template_hash(path, basepath, template_hashes),
+            basepath,
+            assets_hash,
+            minify,
+            includes_hash(previous.get("includes", [])),
+            images.page_hash(previous.get("images", [])) if images is not None else None,
+        )
+        entries[dst]["meta"] = metas[src]
+        if not is_fresh(entry, entries[dst], dst):
+            todo.append((src, dst))
+    keys = None
+    if build_cache is not None:
+        keys = {
+            dst: build_cache.key(
+                entries[dst]["source_hash"], entries[dst]["template_hash"], basepath, assets_hash, minify, images, indexer is not None
+            )
+            for src, dst in todo
+        }
+    infos = render_pages(basepath, todo, template_path, options, jobs, indexer, build_cache, keys)
+    for dst, info in infos.items():
+        entries[dst]["info"] = info.to_dict(links=False)
+        entries[dst]["includes_hash"] = includes_hash(info.includes)
+        if images is not None:
+            entries[dst]["images_hash"] = images.page_hash(info.image_urls())
+    for src, dst in pages:
+        if dst not in infos:
+            entries[dst]["info"] = manifest["pages"][dst].get("info", {})
+    manifest["pages"].update(entries)
+    remove_stale_pages(manifest, set(entries), dest_dir_path)
+    print(f"Skipped {len(pages) - len(todo)} unchanged page(s)")
+    return {dst: (src, infos.get(dst) or RecordedPageInfo(entries[dst]["info"])) for src, dst in pages}
\ No newline at end of file
@@ -0,0 +1,77 @@
+import hashlib
+import os
+import pickle
+import threading
+
+# Bump whenever markdown_to_html_node would produce a different tree for the
+# same input, so stale entries stop matching instead of being served.
+PARSER_VERSION = "6"
+CACHE_DIR = os.path.join(".ssg", "cache", "parse")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class ParseCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+    
+    def key(self, source, terms=False):
+        # Pages parsed for the search index carry their terms; the rest don't.
+        h = hashlib.sha256(PARSER_VERSION.encode("ascii"))
+        h.update(b"\0terms\0" if terms else b"\0")
+        h.update(source)
+        return h.hexdigest()
+    
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+    
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # A corrupt or incompatible entry is just a miss; the next put replaces it.
+            return None
+        try:
+            # The mtime doubles as the last-used time for LRU eviction.
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+    
+    def put(self, key, value):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name plus an atomic rename, so concurrent workers never
+        # observe a half-written entry and the last writer simply wins.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    
+    def prune(self):
+        entries = []
+        total = 0
+        for root, dirs, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
\ No newline at end of file
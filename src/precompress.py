@@ -0,0 +1,130 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE = (".html", ".css", ".js", ".svg", ".xml", ".json")
+# Every variant extension any codec writes, installed here or not.
+VARIANT_EXTENSIONS = (".gz", ".br", ".zst")
+DEFAULT_MIN_SIZE = 1024
+
+def _gzip(data):
+    # mtime=0 keeps the output byte-for-byte reproducible between builds.
+    return gzip.compress(data, 9, mtime=0)
+
+def available_codecs():
+    codecs = [(".gz", "gzip", _gzip)]
+    if brotli is not None:
+        codecs.append((".br", "brotli", lambda data: brotli.compress(data, quality=11)))
+    if zstandard is not None:
+        codecs.append((".zst", "zstd", zstandard.ZstdCompressor(level=19).compress))
+    return codecs
+
+def find_compressible(dst, exclude=()):
+    # exclude holds /-separated paths relative to dst.
+    paths = []
+    for root, dirs, names in os.walk(dst):
+        dirs.sort()
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE):
+                path = os.path.join(root, name)
+                if os.path.relpath(path, dst).replace(os.sep, "/") not in exclude:
+                    paths.append(path)
+    return paths
+
+def remove_variants(dst, rels):
+    removed = 0
+    for rel in rels:
+        for ext in VARIANT_EXTENSIONS:
+            path = os.path.join(dst, *rel.split("/")) + ext
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+    return removed
+
+def _is_current(variant_path, src_st):
+    try:
+        return os.stat(variant_path).st_mtime_ns >= src_st.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def _compress_file(path, codecs, min_size):
+    # Returns [(codec name, original bytes, compressed bytes)] for the
+    # variants written, or None when the file is too small to bother.
+    st = os.stat(path)
+    if st.st_size < min_size:
+        for ext, name, compress in codecs:
+            if os.path.exists(path + ext):
+                os.remove(path + ext)
+        return None
+    data = None
+    written = []
+    for ext, name, compress in codecs:
+        variant_path = path + ext
+        if _is_current(variant_path, st):
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        compressed = compress(data)
+        tmp_path = f"{variant_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, variant_path)
+        written.append((name, len(data), len(compressed)))
+    return written
+
+def remove_orphaned_variants(dst, codecs):
+    removed = 0
+    extensions = tuple(ext for ext, name, compress in codecs)
+    for root, dirs, names in os.walk(dst):
+        for name in names:
+            if name.endswith(extensions) and name.rsplit(".", 1)[0].endswith(COMPRESSIBLE):
+                if not os.path.exists(os.path.join(root, name.rsplit(".", 1)[0])):
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+    return removed
+
+def precompress(dst, min_size=DEFAULT_MIN_SIZE, workers=None, exclude=()):
+    # exclude: files that are never served, such as the plain-named originals
+    # of fingerprinted assets; any variants of them left from earlier builds
+    # are removed too.
+    codecs = available_codecs()
+    exclude = set(exclude)
+    paths = find_compressible(dst, exclude)
+    # zlib, brotli and zstd all release the GIL while compressing, so a
+    # thread pool spreads the work across cores without pickling file data.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda path: _compress_file(path, codecs, min_size), paths))
+    
+    totals = {name: [0, 0, 0] for ext, name, compress in codecs}
+    skipped = 0
+    for written in results:
+        if written is None:
+            skipped += 1
+            continue
+        for name, size, compressed in written:
+            total = totals[name]
+            total[0] += 1
+            total[1] += size
+            total[2] += compressed
+    removed = remove_orphaned_variants(dst, codecs) + remove_variants(dst, exclude)
+    
+    compressed_files = sum(1 for written in results if written)
+    print(
+        f"Precompressed {compressed_files} file(s): {len(paths) - compressed_files - skipped} up to date, "
+        f"{skipped} below {min_size} bytes, {removed} orphaned variant(s) removed"
+    )
+    for name, (count, size, compressed) in totals.items():
+        if count:
+            print(f"  {name:7} {count:5d} file(s) {size / 1024:10.1f} KiB -> {compressed / 1024:10.1f} KiB ({compressed / size:6.1%})")
+    return totals
\ No newline at end of file
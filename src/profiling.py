@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+
+# None while profiling is off, so every hook costs one global lookup and a
+# call that hands back the shared no-op span.
+_events = None
+
+class _NullSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+    
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if _events is not None:
+            _events.append({
+                "name": self.name,
+                "cat": self.cat,
+                "ph": "X",
+                "ts": self.start / 1000,
+                "dur": (end - self.start) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": self.args or {},
+            })
+        return False
+
+def span(name, cat="stage", args=None):
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+def enabled():
+    return _events is not None
+
+def enable():
+    global _events
+    _events = []
+
+def disable():
+    global _events
+    events, _events = _events, None
+    return events or []
+
+def extend(events):
+    if _events is not None:
+        _events.extend(events)
+
+def write_trace(path, events):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+def summarize(events, top=10):
+    stages = {}
+    for event in events:
+        total, count = stages.get(event["name"], (0.0, 0))
+        stages[event["name"]] = (total + event["dur"], count + 1)
+    pages = sorted(
+        (event for event in events if event["cat"] == "page"),
+        key=lambda event: event["dur"],
+        reverse=True,
+    )
+    
+    lines = ["Stage                     total ms    calls   mean ms"]
+    for name, (total, count) in sorted(stages.items(), key=lambda item: item[1][0], reverse=True):
+        lines.append(f"{name:24} {total / 1000:9.2f} {count:8d} {total / 1000 / count:9.3f}")
+    if pages:
+        lines.append("")
+        lines.append(f"Slowest {min(top, len(pages))} page(s)")
+        for event in pages[:top]:
+            lines.append(f"{event['dur'] / 1000:9.2f} ms  {event['args'].get('path', event['name'])}")
+    return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,126 @@
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from front_matter import split_front_matter
+from markdown_blocks import PageInfo, apply_front_matter, markdown_to_html_node, page_template
+from template import load_template
+
+class RenderService:
+    # Keeps compiled templates (via load_template's cache) and imported
+    # modules warm across requests; safe to share between socket clients.
+    def __init__(self, template_dir="."):
+        self.template_dir = os.path.abspath(template_dir)
+        self.count = 0
+        self.total_ms = 0.0
+        # Recent latencies only, so a long-lived server stays bounded.
+        self.latencies = deque(maxlen=10000)
+        self.lock = threading.Lock()
+    
+    def template_path(self, name):
+        path = os.path.abspath(os.path.join(self.template_dir, name))
+        if os.path.commonpath([path, self.template_dir]) != self.template_dir:
+            raise ValueError(f"template {name!r} is outside {self.template_dir}")
+        return path
+    
+    def render(self, request):
+        started = time.perf_counter()
+        response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+        try:
+            response.update(self._render(request))
+        except Exception as e:
+            response["error"] = f"{type(e).__name__}: {e}"
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.count += 1
+            self.total_ms += elapsed
+            self.latencies.append(elapsed)
+        response["ms"] = round(elapsed, 3)
+        return response
+    
+    def _render(self, request):
+        if not isinstance(request, dict) or not isinstance(request.get("markdown"), str):
+            raise ValueError("request must be an object with a markdown string")
+        basepath = request.get("basepath") or "/"
+        minify = bool(request.get("minify"))
+        # Front matter is handled as in a build, so previews match built pages.
+        meta, body = split_front_matter(request["markdown"].splitlines(True))
+        info = PageInfo()
+        node = markdown_to_html_node(body, info, heading_ids=True)
+        apply_front_matter(info, meta)
+        name = request.get("template")
+        if name:
+            template = load_template(self.template_path(page_template(meta, name)), basepath, minify)
+            html = template.render({"Title": info.title, "Content": node, "Page": meta})
+        else:
+            html = "".join(node.iter_html(basepath, minify))
+        return {"html": html, "title": info.title}
+    
+    def handle_line(self, line):
+        # A line holds one request object or a JSON array of them (a batch);
+        # every request gets its own response line, in order.
+        try:
+            requests = json.loads(line)
+        except ValueError as e:
+            yield {"id": None, "error": f"invalid JSON: {e}"}
+            return
+        if not isinstance(requests, list):
+            requests = [requests]
+        for request in requests:
+            yield self.render(request)
+    
+    def summary(self):
+        if not self.count:
+            return "Rendered 0 request(s)"
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return (
+            f"Rendered {self.count} request(s): mean {self.total_ms / self.count:.2f} ms, "
+            f"p50 {latencies[len(latencies) // 2]:.2f} ms, p95 {p95:.2f} ms"
+        )
+
+def serve_stream(service, rfile, wfile):
+    # Binary streams on both ends; each response is flushed as soon as it is
+    # rendered so a client can start on the first page of a batch early.
+    for line in rfile:
+        if not line.strip():
+            continue
+        for response in service.handle_line(line.decode("utf-8")):
+            wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            wfile.flush()
+
+class _StreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            serve_stream(self.server.service, self.rfile, self.wfile)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class RenderSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def __init__(self, path, service):
+        self.service = service
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _StreamHandler)
+
+def serve_render(template_dir=".", socket_path=None):
+    service = RenderService(template_dir)
+    try:
+        if socket_path is None:
+            serve_stream(service, sys.stdin.buffer, sys.stdout.buffer)
+        else:
+            with RenderSocketServer(socket_path, service) as server:
+                print(f"Rendering on unix socket {socket_path}", file=sys.stderr)
+                try:
+                    server.serve_forever()
+                finally:
+                    os.remove(socket_path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(service.summary(), file=sys.stderr)
\ No newline at end of file
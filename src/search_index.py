@@ -0,0 +1,179 @@
+import json
+import os
+import shutil
+from markdown_blocks import parse_page
+from site_index import page_url, write_if_changed
+
+SEARCH_DIR = "search"
+SPILL_DIR = os.path.join(".ssg", "search-spill")
+# Terms are sharded on their first characters, so a client only fetches the
+# shards for the words it is looking up.
+PREFIX_LENGTH = 2
+DEFAULT_MEMORY_MB = 64
+# Rough cost of one pending posting: a (doc, count) tuple, its list slot and
+# its share of the term's dict entry.
+POSTING_BYTES = 96
+
+def shard_name(term):
+    prefix = term[:PREFIX_LENGTH]
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    return "_" + prefix.encode("utf-8").hex()
+
+def encode_postings(postings):
+    # Sorted [(doc, count)] -> flat [gap, count, gap, count, ...]; gaps keep
+    # the numbers, and so the JSON, small for common terms.
+    flat = []
+    last = 0
+    for doc, count in postings:
+        flat.append(doc - last)
+        flat.append(count)
+        last = doc
+    return flat
+
+def decode_postings(flat):
+    postings = []
+    doc = 0
+    for i in range(0, len(flat), 2):
+        doc += flat[i]
+        postings.append((doc, flat[i + 1]))
+    return postings
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+class SearchIndexer:
+    # Postings for pages rendered in this build are held until they exceed
+    # the memory budget, then appended to per-shard spill files. finish()
+    # merges one shard at a time into the existing output, so peak memory is
+    # the budget plus the largest shard whatever the size of the site.
+    def __init__(self, dest_dir, state=None, memory_budget=DEFAULT_MEMORY_MB * 1024 * 1024, spill_dir=SPILL_DIR):
+        self.dest_dir = dest_dir
+        self.out_dir = os.path.join(dest_dir, SEARCH_DIR)
+        if state is None or not os.path.exists(os.path.join(self.out_dir, "index.json")):
+            # Shards on disk without the state that describes them cannot be
+            # updated in place, so the index starts over.
+            shutil.rmtree(self.out_dir, ignore_errors=True)
+            state = {"next_id": 0, "docs": {}, "shards": []}
+        # docs maps page URL -> [doc id, shard names its terms landed in].
+        self.state = state
+        self.max_pending = max(1, memory_budget // POSTING_BYTES)
+        self.spill_dir = spill_dir
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        self.pending = {}
+        self.pending_postings = 0
+        self.spilled = set()
+        self.stale = set()
+        self.dirty = set()
+        self.indexed = 0
+        self.removed = 0
+        self.spills = 0
+    
+    def add(self, dest_path, terms):
+        url = page_url(dest_path, self.dest_dir)
+        docs = self.state["docs"]
+        if url in docs:
+            doc, shards = docs[url]
+            self.stale.add(doc)
+            self.dirty.update(shards)
+        else:
+            doc = self.state["next_id"]
+            self.state["next_id"] += 1
+        shards = set()
+        for term, count in terms.items():
+            name = shard_name(term)
+            shards.add(name)
+            self.pending.setdefault(name, {}).setdefault(term, []).append((doc, count))
+        docs[url] = [doc, sorted(shards)]
+        self.dirty.update(shards)
+        self.indexed += 1
+        self.pending_postings += len(terms)
+        if self.pending_postings > self.max_pending:
+            self.spill()
+    
+    def spill(self):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        for name, terms in self.pending.items():
+            with open(os.path.join(self.spill_dir, name + ".jsonl"), "a", encoding="utf-8") as f:
+                f.write(_dumps(terms) + "\n")
+            self.spilled.add(name)
+        self.pending = {}
+        self.pending_postings = 0
+        self.spills += 1
+    
+    def backfill(self, pages, cache=None):
+        # Pages an incremental build skipped that the index has never seen,
+        # as on the first build with the index turned on, are parsed again.
+        docs = self.state["docs"]
+        for dest_path, (source, info) in sorted(pages.items()):
+            if page_url(dest_path, self.dest_dir) not in docs:
+                node, parsed, meta = parse_page(source, cache, terms=True)
+                self.add(dest_path, parsed.terms)
+    
+    def finish(self, pages):
+        # pages is {dest_path: (source, PageInfo)} for the whole site; returns
+        # the state to keep in the manifest for the next incremental build.
+        docs = self.state["docs"]
+        titles = {page_url(dest_path, self.dest_dir): info.title for dest_path, (source, info) in pages.items()}
+        for url in sorted(set(docs) - set(titles)):
+            doc, shards = docs.pop(url)
+            self.stale.add(doc)
+            self.dirty.update(shards)
+            self.removed += 1
+        
+        os.makedirs(self.out_dir, exist_ok=True)
+        shards = set(self.state["shards"])
+        for name in sorted(self.dirty):
+            if self.write_shard(name):
+                shards.add(name)
+            else:
+                shards.discard(name)
+        self.state["shards"] = sorted(shards)
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        
+        table = [None] * self.state["next_id"]
+        for url, (doc, doc_shards) in docs.items():
+            table[doc] = [url, titles[url]]
+        write_if_changed(os.path.join(self.out_dir, "docs.json"), _dumps(table))
+        write_if_changed(
+            os.path.join(self.out_dir, "index.json"),
+            _dumps({"prefix_length": PREFIX_LENGTH, "shards": self.state["shards"], "documents": len(docs)}),
+        )
+        print(
+            f"Search index: {self.indexed} page(s) indexed, {self.removed} removed, "
+            f"{len(self.dirty)} of {len(shards)} shard(s) rewritten, {self.spills} spill(s)"
+        )
+        return self.state
+    
+    def write_shard(self, name):
+        path = os.path.join(self.out_dir, name + ".json")
+        merged = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+        except FileNotFoundError:
+            existing = {}
+        for term, flat in existing.items():
+            kept = [posting for posting in decode_postings(flat) if posting[0] not in self.stale]
+            if kept:
+                merged[term] = kept
+        if name in self.spilled:
+            with open(os.path.join(self.spill_dir, name + ".jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    for term, postings in json.loads(line).items():
+                        merged.setdefault(term, []).extend(tuple(posting) for posting in postings)
+        for term, postings in self.pending.pop(name, {}).items():
+            merged.setdefault(term, []).extend(postings)
+        
+        if not merged:
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        write_if_changed(path, _dumps({term: encode_postings(sorted(postings)) for term, postings in merged.items()}))
+        return True
+
+def remove_search_index(dest_dir):
+    path = os.path.join(dest_dir, SEARCH_DIR)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+        print(f"Removed stale search index {path}")
\ No newline at end of file
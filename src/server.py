@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+import traceback
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from discovery import scan_tree
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = function () {{ location.reload(); }};</script>'
+)
+
+class BuildState:
+    def __init__(self):
+        self.generation = 0
+        self.changed = threading.Condition()
+    
+    def bump(self):
+        with self.changed:
+            self.generation += 1
+            self.changed.notify_all()
+    
+    def wait(self, generation, timeout):
+        with self.changed:
+            self.changed.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+def snapshot(paths):
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            st = os.stat(path)
+            files[path] = (st.st_mtime_ns, st.st_size)
+            continue
+        # Hidden and .ssgignore'd files never reach the build, so editor swap
+        # files and the like do not trigger rebuilds either.
+        try:
+            entries = scan_tree(path)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files[entry.path] = (st.st_mtime_ns, st.st_size)
+    return files
+
+def watch(paths, rebuild, state, interval, stop):
+    previous = snapshot(paths)
+    while not stop.wait(interval):
+        current = snapshot(paths)
+        if current == previous:
+            continue
+        previous = current
+        started = time.perf_counter()
+        try:
+            rebuild()
+        except Exception:
+            # Keep serving the last good output; the next save retries.
+            traceback.print_exc()
+            continue
+        print(f"Rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+        state.bump()
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, state=None, live_reload=False, **kwargs):
+        self.state = state
+        self.live_reload = live_reload
+        super().__init__(*args, **kwargs)
+    
+    def do_GET(self):
+        if self.live_reload and self.path == LIVE_RELOAD_PATH:
+            self.send_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urlsplit(self.path).path.endswith("/"):
+                # Let the base class redirect to the slash form, so relative
+                # links on the page resolve the same as in production.
+                super().do_GET()
+                return
+            path = os.path.join(path, "index.html")
+        if self.live_reload and path.endswith(".html") and os.path.isfile(path):
+            self.send_html(path)
+            return
+        super().do_GET()
+    
+    def send_html(self, path):
+        with open(path, "rb") as f:
+            body = f.read()
+        marker = body.rfind(b"</body>")
+        script = LIVE_RELOAD_SCRIPT.encode("utf-8")
+        body = body[:marker] + script + body[marker:] if marker != -1 else body + script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.state.generation
+        try:
+            while True:
+                current = self.state.wait(generation, 15)
+                if current != generation:
+                    generation = current
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def serve(directory, port, rebuild=None, watch_paths=None, interval=0.3):
+    state = BuildState()
+    live_reload = watch_paths is not None
+    handler = partial(DevRequestHandler, directory=directory, state=state, live_reload=live_reload)
+    httpd = ThreadingHTTPServer(("", port), handler)
+    httpd.daemon_threads = True
+    stop = threading.Event()
+    if live_reload:
+        watcher = threading.Thread(target=watch, args=(watch_paths, rebuild, state, interval, stop), daemon=True)
+        watcher.start()
+        print(f"Watching {', '.join(watch_paths)} for changes")
+    print(f"Serving {directory} at http://localhost:{port}/")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        httpd.server_close()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import shutil
+from manifest import load_manifest, new_manifest
+
+class MergeError(Exception):
+    pass
+
+def parse_shard(text):
+    # "i/N" with 1 <= i <= N, the way CI matrices usually number their jobs.
+    index, sep, count = text.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        sep = ""
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"invalid shard {text!r}, expected i/N with 1 <= i <= N")
+    return index, count
+
+def shard_of(rel_path, count):
+    # A content hash of the path rather than hash(), which is salted per
+    # process, so every node agrees on the split without coordinating.
+    digest = hashlib.sha256(rel_path.replace(os.sep, "/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def select_shard(pages, shard, content_dir):
+    index, count = shard
+    return [(src, dst) for src, dst in pages if shard_of(os.path.relpath(src, content_dir), count) == index]
+
+def owns_site_files(shard):
+    # Static files belong to the first shard only, so every output path has
+    # exactly one producer.
+    return shard is None or shard[0] == 1
+
+def list_tree(root):
+    files = []
+    for directory, dirs, names in os.walk(root):
+        dirs.sort()
+        for name in sorted(names):
+            files.append(os.path.relpath(os.path.join(directory, name), root))
+    return files
+
+def _load_shard_manifest(path):
+    if not os.path.exists(path):
+        raise MergeError(f"{path}: no manifest, was the shard built with --shard?")
+    manifest = load_manifest(path)
+    if manifest.get("shard") is None:
+        raise MergeError(f"{path}: not a shard manifest or built by another generator version")
+    return manifest
+
+def merge_manifests(manifests):
+    shards = sorted(tuple(manifest["shard"]) for manifest in manifests)
+    count = shards[0][1]
+    if shards != [(index, count) for index in range(1, count + 1)]:
+        got = ", ".join(f"{index}/{n}" for index, n in shards)
+        raise MergeError(f"expected shards 1/{count} to {count}/{count} exactly once, got {got}")
+    merged = new_manifest()
+    for manifest in manifests:
+        merged["pages"].update(manifest["pages"])
+        if manifest["shard"][0] == 1:
+            merged["assets"] = manifest["assets"]
+            if "fingerprints" in manifest:
+                merged["fingerprints"] = manifest["fingerprints"]
+    if len(merged["pages"]) != sum(len(manifest["pages"]) for manifest in manifests):
+        raise MergeError("the same page was rendered by more than one shard")
+    basepaths = {entry["basepath"] for entry in merged["pages"].values()}
+    if len(basepaths) > 1:
+        raise MergeError(f"shards were built with different basepaths: {', '.join(sorted(basepaths))}")
+    return merged
+
+def merge_shards(shard_dirs, dest_dir, tree_name, manifest_name):
+    # Each shard dir holds a shard's output tree and manifest at the same
+    # relative paths a normal build uses. Everything is checked before
+    # dest_dir is touched, so a failed merge leaves the previous site alone.
+    paths = [os.path.join(shard_dir, manifest_name) for shard_dir in shard_dirs]
+    merged = merge_manifests([_load_shard_manifest(path) for path in paths])
+    
+    owners = {}
+    duplicates = []
+    for shard_dir in shard_dirs:
+        tree = os.path.join(shard_dir, tree_name)
+        if os.path.abspath(tree) == os.path.abspath(dest_dir):
+            raise MergeError(f"{tree}: cannot merge a shard into its own output directory")
+        for rel in list_tree(tree):
+            if rel in owners:
+                duplicates.append(f"{rel} (from {owners[rel]} and {shard_dir})")
+            else:
+                owners[rel] = shard_dir
+    if duplicates:
+        raise MergeError(f"{len(duplicates)} output path(s) produced by more than one shard:\n  " + "\n  ".join(duplicates))
+    
+    if os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    for rel, shard_dir in sorted(owners.items()):
+        dst_path = os.path.join(dest_dir, rel)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        # copy2 keeps mtimes, so precompressed variants stay current.
+        shutil.copy2(os.path.join(shard_dir, tree_name, rel), dst_path)
+    print(f"Merged {len(owners)} file(s) and {len(merged['pages'])} page(s) from {len(shard_dirs)} shard(s) into {dest_dir}")
+    return merged
\ No newline at end of file
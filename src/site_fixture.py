@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+def quietly(fn, *args, **kwargs):
+    with redirect_stdout(StringIO()):
+        return fn(*args, **kwargs)
+
+class TempDirTestCase(unittest.TestCase):
+    # A scratch directory per test; write() takes paths relative to it.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+    
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+class SiteTestCase(TempDirTestCase):
+    # The content/, docs/ and template.html layout a build works on.
+    TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+    
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        self.write(self.template, self.TEMPLATE)
+    
+    def read(self, *parts):
+        with open(os.path.join(self.docs, *parts), encoding="utf-8") as f:
+            return f.read()
\ No newline at end of file
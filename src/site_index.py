@@ -0,0 +1,226 @@
+import datetime
+import hashlib
+import html
+import io
+import json
+import os
+from xml.sax.saxutils import escape, quoteattr
+from htmlnode import LeafNode, ParentNode
+from linkcheck import output_url
+from template import load_template
+from fingerprint import UrlRewriter, urls_hash
+from manifest import files_hash
+from markdown_blocks import PageInfo
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+DEFAULT_SECTION = "blog"
+DEFAULT_PER_PAGE = 10
+FEED_LENGTH = 20
+
+class Entry:
+    __slots__ = ("url", "title", "date", "summary", "tags")
+    
+    def __init__(self, url, title, date, summary, tags):
+        self.url = url
+        self.title = title
+        self.date = date
+        self.summary = summary
+        self.tags = tags
+
+def page_url(dest_path, dest_dir):
+    url = output_url(dest_path, dest_dir)
+    if url.endswith("/index.html"):
+        return url[:-len("index.html")]
+    return url
+
+def collect_entries(pages, dest_dir, section=None):
+    # Everything comes from the PageInfo each render handed back (or the
+    # manifest kept for skipped pages); content files are never reread.
+    # With a section, pages outside it are left out and their info unread.
+    prefix = f"/{section}/" if section is not None else "/"
+    entries = []
+    for dest_path, (source, info) in sorted(pages.items()):
+        url = page_url(dest_path, dest_dir)
+        if not url.startswith(prefix):
+            continue
+        date = info.date
+        if not date:
+            date = datetime.date.fromtimestamp(os.stat(source).st_mtime).isoformat()
+        entries.append(Entry(url, info.title, str(date)[:10], info.summary, info.tags))
+    return entries
+
+def section_posts(entries, section):
+    prefix = f"/{section}/"
+    posts = [entry for entry in entries if entry.url.startswith(prefix) and entry.url != prefix]
+    posts.sort(key=lambda entry: entry.title or "")
+    posts.sort(key=lambda entry: entry.date, reverse=True)
+    return posts
+
+def absolute_url(site_url, basepath, url):
+    return site_url.rstrip("/") + basepath.rstrip("/") + url
+
+def listing_url(section, number):
+    return f"/{section}/" if number == 1 else f"/{section}/page/{number}/"
+
+def listing_node(posts, section, number, total):
+    children = []
+    for post in posts:
+        parts = [
+            ParentNode("h2", [LeafNode("a", html.escape(post.title or post.url, quote=False), {"href": post.url})]),
+            ParentNode("p", [LeafNode("time", post.date, {"datetime": post.date})]),
+        ]
+        if post.summary:
+            parts.append(ParentNode("p", [LeafNode(None, html.escape(post.summary, quote=False))]))
+        children.append(ParentNode("article", parts))
+    nav = []
+    if number > 1:
+        nav.append(LeafNode("a", "Newer posts", {"href": listing_url(section, number - 1), "rel": "prev"}))
+    if number < total:
+        nav.append(LeafNode("a", "Older posts", {"href": listing_url(section, number + 1), "rel": "next"}))
+    if nav:
+        children.append(ParentNode("nav", nav))
+    return ParentNode("div", children)
+
+def write_if_changed(path, text):
+    # Unchanged listings keep their mtime, so incremental builds and the
+    # precompress stage leave them alone.
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+def listing_pages(dest_dir, posts, section, per_page):
+    total = max(1, -(-len(posts) // per_page))
+    for number in range(1, total + 1):
+        chunk = posts[(number - 1) * per_page:number * per_page]
+        url = listing_url(section, number)
+        dest_path = os.path.join(dest_dir, *url.strip("/").split("/"), "index.html")
+        title = section.capitalize() if number == 1 else f"{section.capitalize()} - page {number}"
+        yield dest_path, number, total, title, chunk
+
+def listing_info(section, title, chunk):
+    info = PageInfo()
+    info.title = title
+    info.links = [("link", post.url, 0) for post in chunk]
+    return f"<{section} listing>", info
+
+def listing_key(options, number, total, chunk):
+    # Everything one listing page is rendered from, so an incremental build
+    # can tell it would not change without rendering it.
+    fields = [[post.url, post.title, post.date, post.summary, post.tags] for post in chunk]
+    return hashlib.sha256(json.dumps([options, number, total, fields]).encode("utf-8")).hexdigest()
+
+def write_listing_pages(dest_dir, basepath, template_path, posts, section, per_page, assets=None, minify=False, recorded=None):
+    # Returns {dest_path: (label, PageInfo)} so the link checker sees them,
+    # and {dest_path: key}. Pages whose key matches recorded are not
+    # rendered again, so editing one post redoes only its own listing page.
+    template = load_template(template_path, basepath, minify)
+    options = [files_hash(template.dependencies), basepath, section, per_page, urls_hash(assets), minify]
+    written = {}
+    keys = {}
+    for dest_path, number, total, title, chunk in listing_pages(dest_dir, posts, section, per_page):
+        written[dest_path] = listing_info(section, title, chunk)
+        keys[dest_path] = listing_key(options, number, total, chunk)
+        if recorded is not None and recorded.get(dest_path) == keys[dest_path] and os.path.exists(dest_path):
+            continue
+        node = listing_node(chunk, section, number, total)
+        out = io.StringIO()
+        context = {"Title": title, "Content": node, "Page": {"listing": True, "page": number, "pages": total}}
+        template.render_to(UrlRewriter(out, assets) if assets else out, context)
+        if write_if_changed(dest_path, out.getvalue()):
+            print(f"Generating listing {dest_path} ({len(chunk)} post(s))")
+    return written, keys
+
+def remove_stale_listings(manifest, written, pages, keys):
+    # A listing path that is now a rendered page (say a new
+    # content/blog/index.md) belongs to that page and must survive.
+    for dest_path in sorted(set(manifest.get("listings", [])) - set(written) - set(pages)):
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            print(f"Removed stale listing {dest_path}")
+    manifest["listings"] = keys
+
+def write_sitemap(path, entries, site_url, basepath):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for entry in sorted(entries, key=lambda entry: entry.url):
+        lines.append(
+            f"  <url><loc>{escape(absolute_url(site_url, basepath, entry.url))}</loc>"
+            f"<lastmod>{escape(entry.date)}</lastmod></url>"
+        )
+    lines.append("</urlset>")
+    return write_if_changed(path, "\n".join(lines) + "\n")
+
+def write_feed(path, posts, site_url, basepath, title, feed_url):
+    # Atom rather than RSS: it has a single well-defined date format and
+    # requires the stable ids feed readers use to spot new posts.
+    home = absolute_url(site_url, basepath, "/")
+    updated = f"{posts[0].date}T00:00:00Z" if posts else "1970-01-01T00:00:00Z"
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(title)}</title>",
+        f'  <link href="{escape(home)}"/>',
+        f'  <link rel="self" href="{escape(absolute_url(site_url, basepath, feed_url))}"/>',
+        f"  <id>{escape(home)}</id>",
+        f"  <updated>{updated}</updated>",
+    ]
+    for post in posts[:FEED_LENGTH]:
+        url = escape(absolute_url(site_url, basepath, post.url))
+        lines.append("  <entry>")
+        lines.append(f"    <title>{escape(post.title or post.url)}</title>")
+        lines.append(f'    <link href="{url}"/>')
+        lines.append(f"    <id>{url}</id>")
+        lines.append(f"    <updated>{post.date}T00:00:00Z</updated>")
+        for tag in post.tags:
+            lines.append(f"    <category term={quoteattr(tag)}/>")
+        if post.summary:
+            lines.append(f"    <summary>{escape(post.summary)}</summary>")
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return write_if_changed(path, "\n".join(lines) + "\n")
+
+def write_site_index(
+    pages,
+    dest_dir,
+    basepath,
+    template_path,
+    site_url=None,
+    section=DEFAULT_SECTION,
+    per_page=DEFAULT_PER_PAGE,
+    manifest=None,
+    assets=None,
+    minify=False,
+):
+    # Builds the listing pages, and with a site URL the sitemap and feed,
+    # from the metadata the render stage already collected.
+    # Only the sitemap and feed need pages outside the section.
+    entries = collect_entries(pages, dest_dir, None if site_url else section)
+    posts = section_posts(entries, section)
+    written = {}
+    keys = {}
+    listing_path = os.path.join(dest_dir, section, "index.html")
+    if posts and listing_path not in pages:
+        recorded = manifest.get("listings") if manifest is not None else None
+        written, keys = write_listing_pages(
+            dest_dir, basepath, template_path, posts, section, per_page, assets, minify, recorded
+        )
+    if manifest is not None:
+        remove_stale_listings(manifest, written, pages, keys)
+    
+    if site_url:
+        listed = entries + [Entry(page_url(path, dest_dir), info.title, posts[0].date, None, []) for path, (label, info) in written.items()]
+        write_sitemap(os.path.join(dest_dir, SITEMAP_NAME), listed, site_url, basepath)
+        root = next((entry for entry in entries if entry.url == "/"), None)
+        title = root.title if root is not None and root.title else section.capitalize()
+        write_feed(os.path.join(dest_dir, FEED_NAME), posts, site_url, basepath, title, "/" + FEED_NAME)
+        print(f"Wrote {SITEMAP_NAME} ({len(listed)} URL(s)) and {FEED_NAME} ({min(len(posts), FEED_LENGTH)} post(s))")
+    return written
\ No newline at end of file
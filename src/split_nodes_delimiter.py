@@ -1,5 +1,15 @@
+import re
 from textnode import TextType, TextNode
-from extract_markdown import extract_markdown_images, extract_markdown_links
+from extract_markdown import IMAGE_PATTERN, LINK_PATTERN
+from profiling import span
+
+_DELIMITERS = {
+    "`": TextType.CODE,
+    "_": TextType.ITALIC,
+    "**": TextType.BOLD,
+}
+_SPECIAL = re.compile(r"`|_|\*\*|!\[|\[")
+_MARKUP = re.compile(r"`|_|\*\*")
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -25,61 +35,75 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
                 new_nodes.append(TextNode(part, text_type))
     return new_nodes
 
-def split_nodes_image(old_nodes):
-    lst_of_nodes = []
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    new_nodes = []
     for node in old_nodes:
         if node.text_type != TextType.TEXT:
-            lst_of_nodes.append(node)
+            new_nodes.append(node)
             continue
         
         text = node.text
-        images = extract_markdown_images(text)
-        if not images:
-            lst_of_nodes.append(node)
-            continue
-        
-        for alt, url in images:
-            needle = f"![{alt}]({url})"
-            parts = text.split(needle, 1)
-            if len(parts) != 2:
-                break
-            before, after = parts[0], parts[1]
-            if before:
-                lst_of_nodes.append(TextNode(before, TextType.TEXT))
-            lst_of_nodes.append(TextNode(alt, TextType.IMAGE, url))
-            text = after
+        pos = 0
+        for match in pattern.finditer(text):
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            pos = match.end()
         
-        if text:
-            lst_of_nodes.append(TextNode(text, TextType.TEXT))
-    return lst_of_nodes
+        if pos == 0:
+            new_nodes.append(node)
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
+    return new_nodes
+
+def split_nodes_image(old_nodes):
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
 def split_nodes_link(old_nodes):
-    lst_of_nodes = []
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            lst_of_nodes.append(node)
-            continue
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+def has_inline_markup(text):
+    return _MARKUP.search(text) is not None
+
+def text_to_textnodes(text):
+    with span("text_to_textnodes"):
+        return _scan_inline(text)
+
+def _scan_inline(text):
+    # One left-to-right scan: jump between candidate markup characters with a
+    # regex and consume each span as soon as its opener is seen, so the text
+    # is only walked once and the leftmost construct wins.
+    nodes = []
+    start = 0
+    pos = 0
+    while True:
+        special = _SPECIAL.search(text, pos)
+        if special is None:
+            break
+        i = special.start()
+        char = text[i]
         
-        text = node.text
-        links = extract_markdown_links(text)
-        if not links:
-            lst_of_nodes.append(node)
+        if char == "[" or char == "!":
+            match = (IMAGE_PATTERN if char == "!" else LINK_PATTERN).match(text, i)
+            if match is None:
+                pos = i + 1
+                continue
+            if i > start:
+                nodes.append(TextNode(text[start:i], TextType.TEXT))
+            text_type = TextType.IMAGE if char == "!" else TextType.LINK
+            nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            start = pos = match.end()
             continue
         
-        for alt, url in links:
-            needle = f"[{alt}]({url})"
-            parts = text.split(needle, 1)
-            if len(parts) != 2:
-                break
-            before, after = parts[0], parts[1]
-            if before:
-                lst_of_nodes.append(TextNode(before, TextType.TEXT))
-            lst_of_nodes.append(TextNode(alt, TextType.LINK, url))
-            text = after
-        
-        if text:
-            lst_of_nodes.append(TextNode(text, TextType.TEXT))
-    return lst_of_nodes
-
-def text_to_textnodes(text):
-    return split_nodes_link(split_nodes_image(split_nodes_delimiter(split_nodes_delimiter(split_nodes_delimiter([TextNode(text, TextType.TEXT)], "`", TextType.CODE), "_", TextType.ITALIC), "**", TextType.BOLD)))
\ No newline at end of file
+        delimiter = "**" if char == "*" else char
+        end = text.find(delimiter, i + len(delimiter))
+        if end == -1:
+            raise Exception("Invalid markdown, unmatched delimiter")
+        if i > start:
+            nodes.append(TextNode(text[start:i], TextType.TEXT))
+        nodes.append(TextNode(text[i + len(delimiter):end], _DELIMITERS[delimiter]))
+        start = pos = end + len(delimiter)
+    
+    if start < len(text):
+        nodes.append(TextNode(text[start:], TextType.TEXT))
+    return nodes
\ No newline at end of file
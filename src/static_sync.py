@@ -0,0 +1,101 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from discovery import scan_tree
+from manifest import file_hash
+
+def list_files(src):
+    return [entry.rel for entry in scan_tree(src)]
+
+def _copy_bytes(src_path, tmp_path):
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        shutil.copyfile(src_path, tmp_path)
+        return
+    with open(src_path, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+        try:
+            while copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                pass
+        except OSError:
+            # Not supported across these filesystems; fall back to a plain copy.
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst)
+
+def _sync_file(src_path, dst_path, link, src_st):
+    try:
+        dst_st = os.stat(dst_path)
+    except FileNotFoundError:
+        dst_st = None
+    
+    if dst_st is not None and dst_st.st_size == src_st.st_size:
+        if dst_st.st_mtime_ns == src_st.st_mtime_ns:
+            return "unchanged"
+        if file_hash(src_path) == file_hash(dst_path):
+            # Same bytes, only the timestamp drifted: fix it without rewriting.
+            os.utime(dst_path, ns=(src_st.st_atime_ns, src_st.st_mtime_ns))
+            return "unchanged"
+    
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+    if link:
+        try:
+            os.link(src_path, tmp_path)
+            os.replace(tmp_path, dst_path)
+            return "linked"
+        except OSError:
+            pass
+    _copy_bytes(src_path, tmp_path)
+    shutil.copystat(src_path, tmp_path)
+    os.replace(tmp_path, dst_path)
+    return "copied"
+
+def clear_output(dst, keep):
+    # Empties dst except for the relative paths in keep, so a full build can
+    # reuse static copies that sync_static would otherwise write again.
+    keep = set(keep)
+    os.makedirs(dst, exist_ok=True)
+    for root, dirs, names in os.walk(dst, topdown=False):
+        for name in names:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, dst) not in keep:
+                os.remove(path)
+        for name in dirs:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                os.remove(path)
+            elif not os.listdir(path):
+                os.rmdir(path)
+
+def sync_static(src, dst, manifest=None, link=False, workers=None, entries=None):
+    # entries: scan_tree(src) when the caller already has it.
+    if entries is None:
+        entries = scan_tree(src)
+    files = [entry.rel for entry in entries]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda entry: _sync_file(entry.path, os.path.join(dst, entry.rel), link, entry.stat()),
+            entries,
+        ))
+    
+    counts = {"copied": 0, "linked": 0, "unchanged": 0, "removed": 0}
+    for rel, result in zip(files, results):
+        counts[result] += 1
+        if result != "unchanged":
+            print(f"{result.capitalize()} file: {os.path.join(src, rel)} -> {os.path.join(dst, rel)}")
+    
+    if manifest is not None:
+        for rel in sorted(set(manifest["assets"]) - set(files)):
+            dst_path = os.path.join(dst, rel)
+            if os.path.exists(dst_path):
+                os.remove(dst_path)
+                print(f"Removed orphaned file: {dst_path}")
+                counts["removed"] += 1
+        manifest["assets"] = files
+    
+    print(
+        f"Static files: {counts['copied']} copied, {counts['linked']} linked, "
+        f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+    )
+    return counts
\ No newline at end of file
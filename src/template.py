@@ -0,0 +1,186 @@
+import os
+import re
+from htmlnode import BLOCK_TAGS, RAW_TAGS, HTMLNode, collapse_whitespace
+
+_TAG = re.compile(r"\{\{\s*(.*?)\s*\}\}|\{%\s*(.*?)\s*%\}")
+_INCLUDE = re.compile(r"""include\s+["']([^"']+)["']$""")
+_FOR = re.compile(r"for\s+(\w+)\s+in\s+([\w.]+)$")
+_IF = re.compile(r"if\s+(not\s+)?([\w.]+)$")
+_MARKUP = re.compile(r"<!--.*?-->|<(/?)([a-zA-Z!][\w-]*)[^>]*>", re.S)
+# The document-level end tags are always optional once whitespace is gone.
+_OMITTED_END_TAGS = frozenset(("head", "body", "html"))
+
+_cache = {}
+
+class Template:
+    def __init__(self, source, path="<template>", basepath="/", minify=False):
+        self.path = path
+        self.basepath = basepath
+        self.minify = minify
+        self.dependencies = [] if path == "<template>" else [path]
+        # Raw element (<pre>, <script>, ...) the minifier is inside of; literals
+        # are compiled in source order, so this carries across tags.
+        self._raw = None
+        self.nodes = self._compile(source, path, set())
+    
+    def _rebase(self, text):
+        # Only the template's own markup is rewritten; page content gets its
+        # basepath applied per attribute while it is serialized.
+        if self.basepath == "/":
+            return text
+        return text.replace('href="/', f'href="{self.basepath}').replace('src="/', f'src="{self.basepath}')
+    
+    def _literal(self, text):
+        text = self._rebase(text)
+        if self.minify:
+            text = self._minify(text)
+        return text
+    
+    def _minify(self, text):
+        # Tag names on either side of each run of text; None where the literal
+        # meets a template tag and the neighbour is unknown.
+        out = []
+        pos = 0
+        before = None
+        for match in _MARKUP.finditer(text):
+            closing, name = match.group(1), match.group(2)
+            name = name.lower() if name else None
+            segment = text[pos:match.start()]
+            pos = match.end()
+            if self._raw is not None:
+                out.append(segment)
+                out.append(match.group(0))
+                if closing and name == self._raw:
+                    self._raw = None
+                before = name
+                continue
+            out.append(_minify_text(segment, before, name))
+            if name is None:
+                continue
+            if name in RAW_TAGS and not closing:
+                self._raw = name
+            if not (closing and name in _OMITTED_END_TAGS):
+                out.append(match.group(0))
+            before = name
+        segment = text[pos:]
+        out.append(segment if self._raw is not None else _minify_text(segment, before, None))
+        return "".join(out)
+    
+    def _compile(self, source, path, including):
+        root = []
+        stack = [("root", root)]
+        pos = 0
+        for match in _TAG.finditer(source):
+            if match.start() > pos:
+                stack[-1][1].append(self._literal(source[pos:match.start()]))
+            pos = match.end()
+            body = stack[-1][1]
+            if match.group(1) is not None:
+                body.append(("var", match.group(1).split(".")))
+                continue
+            
+            statement = match.group(2)
+            if _INCLUDE.match(statement):
+                include_path = os.path.join(os.path.dirname(path), _INCLUDE.match(statement).group(1))
+                if include_path in including:
+                    raise ValueError(f"{path}: recursive include of {include_path}")
+                with open(include_path, "r", encoding="utf-8") as f:
+                    included = f.read()
+                self.dependencies.append(include_path)
+                body.extend(self._compile(included, include_path, including | {include_path}))
+            elif _FOR.match(statement):
+                name, items = _FOR.match(statement).groups()
+                node = ["for", name, items.split("."), []]
+                body.append(node)
+                stack.append(("for", node[3]))
+            elif _IF.match(statement):
+                negate, value = _IF.match(statement).groups()
+                node = ["if", value.split("."), negate is not None, [], []]
+                body.append(node)
+                stack.append(("if", node[3]))
+            elif statement == "else" and stack[-1][0] == "if":
+                stack[-1] = ("else", stack[-2][1][-1][4])
+            elif statement == "endfor" and stack[-1][0] == "for":
+                stack.pop()
+            elif statement == "endif" and stack[-1][0] in ("if", "else"):
+                stack.pop()
+            else:
+                raise ValueError(f"{path}: unexpected {{% {statement} %}}")
+        if len(stack) > 1:
+            raise ValueError(f"{path}: unclosed {{% {stack[-1][0]} %}}")
+        if pos < len(source):
+            root.append(self._literal(source[pos:]))
+        return root
+    
+    def _lookup(self, names, scopes, required=True):
+        for scope in reversed(scopes):
+            if names[0] in scope:
+                value = scope[names[0]]
+                break
+        else:
+            if required:
+                raise ValueError(f"{self.path}: undefined template variable {'.'.join(names)}")
+            return None
+        for name in names[1:]:
+            if not isinstance(value, dict):
+                value = getattr(value, name, None)
+            elif name in value:
+                value = value[name]
+            elif required:
+                raise ValueError(f"{self.path}: undefined template variable {'.'.join(names)}")
+            else:
+                return None
+        return value
+    
+    def _iter(self, nodes, scopes):
+        for node in nodes:
+            if node.__class__ is str:
+                yield node
+            elif node[0] == "var":
+                value = self._lookup(node[1], scopes)
+                if isinstance(value, HTMLNode):
+                    yield from value.iter_html(self.basepath, self.minify)
+                elif value is not None:
+                    yield str(value)
+            elif node[0] == "for":
+                for item in self._lookup(node[2], scopes, False) or ():
+                    yield from self._iter(node[3], scopes + [{node[1]: item}])
+            else:
+                value = bool(self._lookup(node[1], scopes, False))
+                yield from self._iter(node[3] if value != node[2] else node[4], scopes)
+    
+    def iter_render(self, context):
+        return self._iter(self.nodes, [context])
+    
+    def render(self, context):
+        return "".join(self.iter_render(context))
+    
+    def render_to(self, fp, context):
+        write = fp.write
+        for fragment in self.iter_render(context):
+            write(fragment)
+
+def _minify_text(text, before, after):
+    if not text:
+        return text
+    if before in BLOCK_TAGS:
+        text = text.lstrip()
+    if after in BLOCK_TAGS:
+        text = text.rstrip()
+    return collapse_whitespace(text)
+
+def _mtimes(paths):
+    try:
+        return [os.stat(path).st_mtime_ns for path in paths]
+    except OSError:
+        return None
+
+def load_template(path, basepath="/", minify=False):
+    key = (os.path.abspath(path), basepath, minify)
+    cached = _cache.get(key)
+    if cached is not None and _mtimes(cached[1].dependencies) == cached[0]:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        template = Template(f.read(), path, basepath, minify)
+    _cache[key] = (_mtimes(template.dependencies), template)
+    return template
\ No newline at end of file
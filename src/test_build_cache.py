@@ -0,0 +1,82 @@
+import os
+import tempfile
+import threading
+import unittest
+from build_cache import BuildCache, DirectoryStore, HttpStore, make_build_cache_server
+from markdown_blocks import generate_pages_recursive
+from site_fixture import SiteTestCase, quietly
+
+KEY = "ab" * 32
+
+class TestStores(unittest.TestCase):
+    def test_directory_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = DirectoryStore(tmp)
+            self.assertIsNone(store.get(KEY))
+            store.put(KEY, b"data")
+            self.assertEqual(store.get(KEY), b"data")
+    
+    def test_http_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            httpd = make_build_cache_server(tmp, 0)
+            thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+            thread.start()
+            try:
+                store = HttpStore(f"http://127.0.0.1:{httpd.server_address[1]}")
+                self.assertIsNone(store.get(KEY))
+                store.put(KEY, b"data")
+                self.assertEqual(store.get(KEY), b"data")
+                self.assertEqual(DirectoryStore(tmp).get(KEY), b"data")
+            finally:
+                httpd.shutdown()
+                httpd.server_close()
+
+
+class TestBuildCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = DirectoryStore(os.path.join(self.root, "cache"))
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[About](/about.html)")
+        self.write(os.path.join(self.content, "about.md"), "# About\n\n{% include \"_bio.md\" %}")
+        self.write(os.path.join(self.content, "_bio.md"), "Written by a hobbit.")
+    
+    def build(self, basepath="/"):
+        build_cache = BuildCache(self.store)
+        pages = quietly(generate_pages_recursive, basepath, self.content, self.template, self.docs, build_cache=build_cache)
+        build_cache.close()
+        return build_cache, pages
+    
+    def test_hits_restore_pages_and_info(self):
+        first, pages = self.build()
+        self.assertEqual((first.hits, first.misses, first.stored), (0, 2, 2))
+        expected = self.read("about.html")
+        os.remove(os.path.join(self.docs, "about.html"))
+        second, cached = self.build()
+        self.assertEqual((second.hits, second.misses, second.stored), (2, 0, 0))
+        self.assertEqual(self.read("about.html"), expected)
+        info = cached[os.path.join(self.docs, "index.html")][1]
+        self.assertEqual(info.title, "Home")
+        self.assertEqual(info.links, pages[os.path.join(self.docs, "index.html")][1].links)
+    
+    def test_key_covers_basepath(self):
+        self.build()
+        build_cache, pages = self.build("/site/")
+        self.assertEqual(build_cache.hits, 0)
+    
+    def test_changed_partial_is_not_served(self):
+        self.build()
+        self.write(os.path.join(self.content, "_bio.md"), "Written by an elf.")
+        build_cache, pages = self.build()
+        self.assertEqual((build_cache.hits, build_cache.stale), (1, 1))
+        self.assertIn("elf", self.read("about.html"))
+    
+    def test_unreachable_store_only_misses(self):
+        build_cache = BuildCache(HttpStore("http://127.0.0.1:9", timeout=1))
+        quietly(generate_pages_recursive, "/", self.content, self.template, self.docs, build_cache=build_cache)
+        build_cache.close()
+        self.assertEqual((build_cache.misses, build_cache.errors), (2, 4))
+        self.assertIn("Home", self.read("index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
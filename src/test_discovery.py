@@ -0,0 +1,66 @@
+import os
+import unittest
+from discovery import IgnoreRules, scan_tree
+from markdown_blocks import find_pages
+from site_fixture import TempDirTestCase, quietly
+from static_sync import sync_static
+
+class TestIgnoreRules(unittest.TestCase):
+    def test_patterns(self):
+        rules = IgnoreRules(["# comment", "", "*.psd", "/drafts/", "notes/*.md", "build/", "**/tmp", "!keep.psd"])
+        self.assertTrue(rules.ignored("a/b/logo.psd"))
+        self.assertFalse(rules.ignored("a/keep.psd"))
+        self.assertTrue(rules.ignored("drafts", is_dir=True))
+        self.assertFalse(rules.ignored("drafts"))
+        self.assertFalse(rules.ignored("blog/drafts", is_dir=True))
+        self.assertTrue(rules.ignored("notes/todo.md"))
+        self.assertFalse(rules.ignored("notes/old/todo.md"))
+        self.assertFalse(rules.ignored("blog/notes/todo.md"))
+        self.assertTrue(rules.ignored("blog/build", is_dir=True))
+        self.assertTrue(rules.ignored("tmp"))
+        self.assertTrue(rules.ignored("a/b/tmp"))
+        self.assertFalse(rules.ignored("a/b/tmpfile"))
+
+
+class TestScanTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for rel in ("b.md", "a/z.md", "a/b.md", "a.md", ".hidden.md", "drafts/wip.md", "raw/logo.psd", "_bio.md"):
+            self.write(rel, "# Page")
+    
+    def rels(self, entries):
+        return [entry.rel.replace(os.sep, "/") for entry in entries]
+    
+    def test_sorted_and_hidden_skipped(self):
+        entries = scan_tree(self.root)
+        self.assertEqual(
+            self.rels(entries),
+            ["_bio.md", "a/b.md", "a/z.md", "a.md", "b.md", "drafts/wip.md", "raw/logo.psd"],
+        )
+        self.assertEqual(entries[0].path, os.path.join(self.root, "_bio.md"))
+        self.assertEqual(entries[0].stat().st_size, len("# Page"))
+    
+    def test_ssgignore(self):
+        self.write(".ssgignore", "drafts/\n*.psd\n")
+        self.assertEqual(self.rels(scan_tree(self.root)), ["_bio.md", "a/b.md", "a/z.md", "a.md", "b.md"])
+    
+    def test_find_pages(self):
+        self.write(".ssgignore", "/a/z.md\n")
+        files = {}
+        pages = find_pages(self.root, "docs", files)
+        self.assertEqual(
+            [(os.path.relpath(src, self.root).replace(os.sep, "/"), dst.replace(os.sep, "/")) for src, dst in pages],
+            [("a/b.md", "docs/a/b.html"), ("a.md", "docs/a.html"), ("b.md", "docs/b.html"), ("drafts/wip.md", "docs/drafts/wip.html")],
+        )
+        self.assertEqual(sorted(files), sorted(src for src, dst in pages))
+    
+    def test_sync_static_honours_ssgignore(self):
+        self.write(".ssgignore", "*.md\nout/\n")
+        dst = os.path.join(self.root, "out")
+        counts = quietly(sync_static, self.root, dst)
+        self.assertEqual(counts["copied"], 1)
+        self.assertEqual(os.listdir(dst), ["raw"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
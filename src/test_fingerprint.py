@@ -0,0 +1,64 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from fingerprint import UrlRewriter, asset_urls, fingerprint_assets, fingerprint_name, write_deploy_manifest
+from manifest import new_manifest
+from site_fixture import TempDirTestCase
+
+class TestFingerprint(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dst = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.dst, "index.css"), "body {}")
+        self.write(os.path.join(self.dst, "images", "a.png"), "png")
+    
+    def fingerprint(self, manifest):
+        with redirect_stdout(StringIO()):
+            return fingerprint_assets(self.dst, ["index.css", os.path.join("images", "a.png")], manifest)
+    
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("images/a.png", "0123456789abcdef"), "images/a.0123456789.png")
+        self.assertEqual(fingerprint_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+    
+    def test_hashed_twins(self):
+        manifest = new_manifest()
+        names = self.fingerprint(manifest)
+        css = names["index.css"]
+        self.assertRegex(css, r"^index\.[0-9a-f]{10}\.css$")
+        with open(os.path.join(self.dst, css), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "body {}")
+        
+        self.write(os.path.join(self.dst, "index.css"), "body { color: red; }")
+        changed = self.fingerprint(manifest)["index.css"]
+        self.assertNotEqual(changed, css)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, css)))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, changed)))
+    
+    def test_rewriter(self):
+        urls = asset_urls({"index.css": "index.abc.css"}, "/site/")
+        out = io.StringIO()
+        rewriter = UrlRewriter(out, urls)
+        rewriter.write('<link href="/site/index.css" rel="stylesheet" />')
+        rewriter.write('<a href="/site/index.css.map">map</a>')
+        self.assertEqual(
+            out.getvalue(),
+            '<link href="/site/index.abc.css" rel="stylesheet" /><a href="/site/index.css.map">map</a>',
+        )
+    
+    def test_deploy_manifest(self):
+        path = os.path.join(self.root, "state", "deploy.json")
+        with redirect_stdout(StringIO()):
+            files, changed, removed = write_deploy_manifest(path, self.dst, ["index.css"])
+            self.assertEqual(sorted(files), ["images/a.png"])
+            self.assertEqual(changed, ["images/a.png"])
+            self.write(os.path.join(self.dst, "images", "a.png"), "png2")
+            self.assertEqual(write_deploy_manifest(path, self.dst)[1], ["images/a.png", "index.css"])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(sorted(json.load(f)["files"]), ["images/a.png", "index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from fragment_cache import FragmentCache
+from markdown_blocks import PageInfo, markdown_to_html_node
+
+PAGE = """# Title
+
+Shared **disclaimer** with a [link](/legal/).
+
+- repeated item
+- another
+
+## Notes
+
+Shared **disclaimer** with a [link](/legal/).
+"""
+
+class TestFragmentCache(unittest.TestCase):
+    def test_lru_and_stats(self):
+        cache = FragmentCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIn("50.0% hit rate", cache.summary())
+        
+        stats = cache.take_stats()
+        self.assertEqual(cache.hits, 0)
+        cache.merge_stats(stats)
+        self.assertEqual(cache.hits, 1)
+    
+    def test_same_output_and_links(self):
+        plain_info = PageInfo()
+        plain = markdown_to_html_node(PAGE, plain_info, heading_ids=True)
+        cache = FragmentCache()
+        for _ in range(2):
+            info = PageInfo()
+            node = markdown_to_html_node(PAGE, info, heading_ids=True, fragments=cache)
+            self.assertEqual(node.to_html(), plain.to_html())
+            self.assertEqual("".join(node.iter_html("/site/", True)), "".join(plain.iter_html("/site/", True)))
+            self.assertEqual(info.links, plain_info.links)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 4)
+    
+    def test_partials(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "_partials"))
+            bio = os.path.join(tmp, "_partials", "bio.md")
+            with open(bio, "w", encoding="utf-8") as f:
+                f.write("## Author\n\nBy [me](/about/).\n")
+            page = '# Post\n\nBody.\n\n{% include "_partials/bio.md" %}\n'
+            cache = FragmentCache()
+            for _ in range(2):
+                info = PageInfo()
+                node = markdown_to_html_node(page, info, True, cache, tmp)
+                self.assertEqual(
+                    node.to_html(),
+                    '<div><h1 id="post">Post</h1><p>Body.</p><h2 id="author">Author</h2><p>By <a href="/about/">me</a>.</p></div>',
+                )
+                self.assertEqual(info.links, [("link", "/about/", 5)])
+                self.assertEqual(info.includes, [bio])
+                self.assertEqual(info.anchors, ["post", "author"])
+            self.assertEqual((cache.partial_uses, len(cache.partials)), (2, 1))
+            
+            with open(bio, "a", encoding="utf-8") as f:
+                f.write('\n{% include "bio.md" %}\n')
+            with self.assertRaises(ValueError):
+                markdown_to_html_node(page, PageInfo(), True, None, tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import datetime
+import os
+import tempfile
+import unittest
+from front_matter import is_published, read_front_matter, split_front_matter
+from manifest import new_manifest
+from markdown_blocks import generate_pages_recursive, iter_blocks
+from site_fixture import SiteTestCase, quietly
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse(self):
+        meta, body = split_front_matter([
+            "---\n",
+            'title: "Hello: World"\n',
+            "date: 2024-05-01\n",
+            "draft: false\n",
+            "tags: [a, b]\n",
+            "aliases:\n",
+            "  - /old/\n",
+            "# a comment\n",
+            "---\n",
+            "# Heading\n",
+        ])
+        self.assertEqual(meta, {
+            "title": "Hello: World",
+            "date": "2024-05-01",
+            "draft": False,
+            "tags": ["a", "b"],
+            "aliases": ["/old/"],
+        })
+        blocks = list(iter_blocks(body))
+        self.assertEqual((blocks[0].lines, blocks[0].start), (["# Heading"], 10))
+    
+    def test_no_front_matter(self):
+        meta, body = split_front_matter(["# Title\n", "---\n", "text\n"])
+        self.assertEqual(meta, {})
+        self.assertEqual(list(body), ["# Title\n", "---\n", "text\n"])
+        meta, body = split_front_matter(["---\n", "no closing fence\n"])
+        self.assertEqual((meta, list(body)), ({}, ["---\n", "no closing fence\n"]))
+    
+    def test_header_only_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "wb") as f:
+                # The body is not valid UTF-8, so reading past the header would fail.
+                f.write(b"---\ndraft: yes\n---\n" + b"\n" * 10000 + b"\xff\xfe")
+            self.assertEqual(read_front_matter(path), {"draft": True})
+    
+    def test_is_published(self):
+        today = datetime.date(2024, 5, 1)
+        self.assertTrue(is_published({}, today))
+        self.assertTrue(is_published({"date": "2024-05-01"}, today))
+        self.assertTrue(is_published({"date": "2024-04-30T10:00:00"}, today))
+        self.assertFalse(is_published({"date": "2024-05-02"}, today))
+        self.assertFalse(is_published({"draft": True}, today))
+        with self.assertRaises(ValueError):
+            is_published({"date": "soon"}, today)
+
+
+class TestFrontMatterPages(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.root, "post.html"), "<h1>{{ Title }}</h1><time>{{ Page.date }}</time>{{ Content }}")
+        self.write(os.path.join(self.content, "post.md"), "---\ntitle: Post\ndate: 2020-01-01\ntemplate: post.html\n---\n\nbody")
+        self.write(os.path.join(self.content, "draft.md"), "---\ndraft: true\n---\n# Draft")
+        self.write(os.path.join(self.content, "future.md"), "---\ndate: 9999-01-01\n---\n# Later")
+    
+    def build(self, drafts=False, manifest=None):
+        return quietly(generate_pages_recursive, "/", self.content, self.template, self.docs, manifest, drafts=drafts)
+    
+    def test_drafts_and_templates(self):
+        pages = self.build()
+        self.assertEqual(sorted(pages), [os.path.join(self.docs, "post.html")])
+        src, info = pages[os.path.join(self.docs, "post.html")]
+        self.assertEqual((info.title, info.date), ("Post", "2020-01-01"))
+        with open(os.path.join(self.docs, "post.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<h1>Post</h1><time>2020-01-01</time><div><p>body</p></div>")
+        self.assertEqual(len(self.build(drafts=True)), 3)
+    
+    def test_unchanged_sources_reuse_recorded_front_matter(self):
+        manifest = new_manifest()
+        self.build(manifest=manifest)
+        path = os.path.join(self.content, "post.md")
+        self.assertEqual(manifest["pages"][os.path.join(self.docs, "post.html")]["meta"]["template"], "post.html")
+        # Same size and mtime: trusted like the recorded source hash, so the
+        # new date is not read.
+        st = os.stat(path)
+        with open(path, "r+", encoding="utf-8") as f:
+            text = f.read()
+            f.seek(0)
+            f.write(text.replace("2020-01-01", "9999-01-01"))
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(len(self.build(manifest=manifest)), 1)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        self.assertEqual(len(self.build(manifest=manifest)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -106,6 +108,50 @@ class TestHTMLNode(unittest.TestCase):
             node.to_html(),
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
+    
+    def test_iter_html_fragments(self):
+        node = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, "text")], {"class": "x"})
+        self.assertEqual(
+            list(node.iter_html()),
+            ['<p class="x">', "<b>Bold</b>", "text", "</p>"],
+        )
+    
+    def test_write_html(self):
+        node = ParentNode("div", [ParentNode("span", [LeafNode(None, "hi")])])
+        out = io.StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+    
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode(None, "deep")
+        for _ in range(sys.getrecursionlimit() * 2):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertIn("deep", html)
+    
+    def test_to_html_no_children(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+    
+    def test_minify(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "two   spaced\n words"), LeafNode("img", "", {"src": "/a.png"})]),
+            ParentNode("pre", [ParentNode("code", [LeafNode(None, "keep   this\n  indent\n")])]),
+            ParentNode("ul", [ParentNode("li", [LeafNode(None, "a")]), ParentNode("li", [LeafNode("code", "x  y")])]),
+            ParentNode("p", [LeafNode("a", "end", {"href": "/"})]),
+        ])
+        self.assertEqual(
+            "".join(node.iter_html("/site/", minify=True)),
+            '<div><p>two spaced words<img src="/site/a.png"><pre><code>keep   this\n  indent\n</code></pre>'
+            '<ul><li>a<li><code>x  y</code></ul><p><a href="/site/">end</a></div>',
+        )
+    
+    def test_minify_keeps_p_end_before_text(self):
+        node = ParentNode("a", [ParentNode("p", [LeafNode(None, "x")]), LeafNode(None, "y")])
+        self.assertEqual("".join(node.iter_html(minify=True)), "<a><p>x</p>y</a>")
+        self.assertEqual("".join(ParentNode("a", [ParentNode("p", [LeafNode(None, "x")])]).iter_html(minify=True)), "<a><p>x</p></a>")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from image_size import ImageSizes, image_size, read_image_size
+from manifest import new_manifest
+from markdown_blocks import generate_pages_recursive
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+def jpeg(width, height):
+    app1 = b"\xff\xe1" + struct.pack(">H", 18) + b"Exif\x00\x00" + b"\x00" * 10
+    sof = b"\xff\xc2" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app1 + sof + b"\xff\xd9"
+
+class TestReadImageSize(unittest.TestCase):
+    def size(self, data):
+        return read_image_size(io.BytesIO(data))
+    
+    def test_png(self):
+        self.assertEqual(self.size(png(640, 480)), (640, 480))
+    
+    def test_gif(self):
+        self.assertEqual(self.size(b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 20), (32, 16))
+    
+    def test_jpeg_skips_segments_before_the_frame(self):
+        self.assertEqual(self.size(jpeg(1200, 800)), (1200, 800))
+    
+    def test_webp(self):
+        lossy = b"RIFF\x00\x00\x00\x00WEBPVP8 " + b"\x00" * 7 + b"\x9d\x01\x2a" + struct.pack("<HH", 300, 200)
+        self.assertEqual(self.size(lossy), (300, 200))
+        bits = (300 - 1) | ((200 - 1) << 14)
+        lossless = b"RIFF\x00\x00\x00\x00WEBPVP8L" + b"\x00" * 4 + b"\x2f" + bits.to_bytes(4, "little") + b"\x00" * 5
+        self.assertEqual(self.size(lossless), (300, 200))
+        extended = b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (299).to_bytes(3, "little") + (199).to_bytes(3, "little")
+        self.assertEqual(self.size(extended), (300, 200))
+    
+    def test_unknown(self):
+        self.assertIsNone(self.size(b"<svg></svg>"))
+        self.assertIsNone(self.size(b"\xff\xd8\xff\xe1"))
+
+
+class TestImageRewriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write_image("a.png", png(640, 480))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def write_image(self, name, data):
+        with open(os.path.join(self.static, "images", name), "wb") as f:
+            f.write(data)
+    
+    def render(self, html, basepath="/", priority_first=False):
+        out = StringIO()
+        ImageSizes(self.static, priority_first).writer(out, basepath).write(html)
+        return out.getvalue()
+    
+    def test_attributes(self):
+        self.assertEqual(
+            self.render('<p><img src="/site/images/a.png" alt="A"></p>', "/site/"),
+            '<p><img src="/site/images/a.png" alt="A" width="640" height="480" loading="lazy" decoding="async"></p>',
+        )
+    
+    def test_angle_bracket_in_alt_text(self):
+        self.assertEqual(
+            self.render('<img src="/images/a.png" alt="before > after"></img>'),
+            '<img src="/images/a.png" alt="before > after" width="640" height="480" loading="lazy" decoding="async"></img>',
+        )
+        self.assertEqual(
+            self.render('<img alt=\'width="1" src="/x.png"\' src="/images/a.png">'),
+            '<img alt=\'width="1" src="/x.png"\' src="/images/a.png" width="640" height="480" loading="lazy" decoding="async">',
+        )
+    
+    def test_priority_first_image_only(self):
+        html = self.render('<img src="/images/a.png" alt=""><img src="/images/a.png" alt="">', priority_first=True)
+        self.assertEqual(html.count('fetchpriority="high"'), 1)
+        self.assertEqual(html.count('loading="lazy"'), 1)
+        self.assertLess(html.index("fetchpriority"), html.index("loading"))
+    
+    def test_unsized_and_existing_attributes(self):
+        self.assertEqual(
+            self.render('<img src="https://example.com/x.png" alt="">'),
+            '<img src="https://example.com/x.png" alt="" loading="lazy" decoding="async">',
+        )
+        self.assertEqual(
+            self.render('<img src="/images/a.png" width="10" loading="eager" />'),
+            '<img src="/images/a.png" width="10" loading="eager" decoding="async"/>',
+        )
+        self.assertNotIn("width", self.render('<img src="/images/../../secret.png" alt="">'))
+    
+    def test_cached_by_mtime(self):
+        path = os.path.join(self.static, "images", "a.png")
+        self.assertEqual(image_size(path), (640, 480))
+        self.write_image("a.png", png(64, 48))
+        os.utime(path, ns=(0, 1))
+        self.assertEqual(image_size(path), (64, 48))
+    
+    def test_incremental_rerenders_when_an_image_changes_size(self):
+        content = os.path.join(self.tmp.name, "content")
+        docs = os.path.join(self.tmp.name, "docs")
+        template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(content)
+        with open(template, "w") as f:
+            f.write("{{ Content }}")
+        with open(os.path.join(content, "index.md"), "w") as f:
+            f.write("# Home\n\n![A](/images/a.png)")
+        manifest = new_manifest()
+        images = ImageSizes(self.static)
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive("/", content, template, docs, manifest, images=images)
+        self.write_image("a.png", png(64, 48))
+        os.utime(os.path.join(self.static, "images", "a.png"), ns=(0, 2))
+        with redirect_stdout(StringIO()) as out:
+            generate_pages_recursive("/", content, template, docs, manifest, images=images)
+        self.assertIn("Skipped 0 unchanged", out.getvalue())
+        with open(os.path.join(docs, "index.html")) as f:
+            self.assertIn('width="64" height="48"', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
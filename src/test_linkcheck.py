@@ -0,0 +1,67 @@
+import unittest
+from fragment_cache import FragmentCache
+from linkcheck import LinkIndex, build_link_index
+from markdown_blocks import PageInfo, markdown_to_html_node
+
+def page_info(markdown):
+    info = PageInfo()
+    markdown_to_html_node(markdown, info, heading_ids=True)
+    return info
+
+class TestLinkCheck(unittest.TestCase):
+    def index(self, pages, assets=()):
+        return build_link_index(
+            {f"docs{url}": (f"content{url}.md", page_info(markdown)) for url, markdown in pages.items()},
+            "docs",
+            assets,
+        )
+    
+    def test_collects_links_and_anchors(self):
+        info = page_info("# Home\n\n## Getting Started\n\nSee [the blog](/blog/)\nand ![cat](/images/cat.png)")
+        self.assertEqual(info.anchors, ["home", "getting-started"])
+        self.assertEqual(info.links, [("link", "/blog/", 5), ("image", "/images/cat.png", 6)])
+    
+    def test_repeated_targets_get_their_own_lines(self):
+        markdown = "# Home\n\nsee [a](/gone)\nmore\nand [b](/gone) [c](/gone)"
+        expected = [("link", "/gone", 3), ("link", "/gone", 5), ("link", "/gone", 5)]
+        self.assertEqual(page_info(markdown).links, expected)
+        info = PageInfo()
+        markdown_to_html_node(markdown, info, fragments=FragmentCache())
+        self.assertEqual(info.links, expected)
+    
+    def test_valid_links(self):
+        index = self.index(
+            {
+                "/index.html": "# Home\n\n[blog](/blog/index.html) [post](blog/post/#intro) ![x](/images/x.png)",
+                "/blog/index.html": "# Blog\n\n[home](../index.html) [top](#blog)",
+                "/blog/post/index.html": "# Post\n\n## Intro\n\n[elsewhere](https://example.com/missing)",
+            },
+            ["images/x.png"],
+        )
+        self.assertEqual(index.validate(), [])
+    
+    def test_broken_links(self):
+        index = self.index({
+            "/index.html": "# Home\n\n[gone](/nowhere/)\n\n[bad anchor](/index.html#missing)\n\n![img](/images/none.png)",
+        })
+        broken = [str(link) for link in index.validate()]
+        self.assertEqual(broken, [
+            "content/index.html.md:3: broken link /nowhere/ (no such page or file)",
+            "content/index.html.md:5: broken link /index.html#missing (no anchor #missing)",
+            "content/index.html.md:7: broken image /images/none.png (no such page or file)",
+        ])
+    
+    def test_graph(self):
+        index = LinkIndex()
+        index.add_page("/index.html", "content/index.md", page_info("# Home\n\n[a](/a/) [b](https://x.org)"))
+        index.add_page("/a/index.html", "content/a/index.md", page_info("# A"))
+        graph = index.graph()
+        self.assertEqual(graph["pages"]["/index.html"]["links"], [
+            {"kind": "link", "target": "/a/index.html", "fragment": "", "line": 3},
+            {"kind": "link", "target": "https://x.org", "line": 3, "external": True},
+        ])
+        self.assertEqual(graph["pages"]["/a/index.html"]["anchors"], ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
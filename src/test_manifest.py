@@ -0,0 +1,124 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from linkcheck import fill_links
+from manifest import new_manifest, load_manifest, manifest_changed, manifest_snapshot, save_manifest
+from markdown_blocks import generate_pages_recursive
+from site_fixture import SiteTestCase
+
+class TestIncrementalBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nworld")
+    
+    def build(self, manifest, basepath="/", jobs=1):
+        out = StringIO()
+        with redirect_stdout(out):
+            self.pages = generate_pages_recursive(basepath, self.content, self.template, self.docs, manifest, jobs=jobs)
+        return out.getvalue()
+    
+    def test_unchanged_pages_are_skipped(self):
+        manifest = new_manifest()
+        log = self.build(manifest)
+        self.assertEqual(log.count("Generating page"), 2)
+        log = self.build(manifest)
+        self.assertEqual(log.count("Generating page"), 0)
+        self.assertIn("Skipped 2 unchanged page(s)", log)
+    
+    def test_changed_source_is_rendered(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nchanged")
+        log = self.build(manifest)
+        self.assertEqual(log.count("Generating page"), 1)
+        with open(os.path.join(self.docs, "index.html"), encoding="utf-8") as f:
+            self.assertIn("changed", f.read())
+    
+    def test_template_and_basepath_invalidate(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.assertEqual(self.build(manifest, "/site/").count("Generating page"), 2)
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build(manifest, "/site/").count("Generating page"), 2)
+    
+    def test_partial_change_invalidates_includers(self):
+        os.makedirs(os.path.join(self.content, "_partials"))
+        bio = os.path.join(self.content, "_partials", "bio.md")
+        self.write(bio, "by me")
+        self.write(os.path.join(self.content, "index.md"), '# Home\n\n{% include "_partials/bio.md" %}')
+        manifest = new_manifest()
+        self.assertEqual(self.build(manifest).count("Generating page"), 2)
+        self.assertEqual(self.build(manifest).count("Generating page"), 0)
+        self.write(bio, "by someone else")
+        self.assertEqual(self.build(manifest).count("Generating page"), 1)
+        with open(os.path.join(self.docs, "index.html"), encoding="utf-8") as f:
+            self.assertIn("someone else", f.read())
+    
+    def test_removed_source_deletes_output(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.build(manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+        self.assertNotIn(os.path.join(self.docs, "blog", "post.html"), manifest["pages"])
+    
+    def test_manifest_round_trip(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        path = os.path.join(self.root, ".ssg", "manifest.json")
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path), manifest)
+        self.assertEqual(load_manifest(os.path.join(self.root, "missing.json")), new_manifest())
+    
+    def test_manifest_changed(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        snapshot = manifest_snapshot(manifest)
+        self.build(manifest)
+        self.assertFalse(manifest_changed(manifest, snapshot))
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nchanged")
+        self.build(manifest)
+        self.assertTrue(manifest_changed(manifest, snapshot))
+    
+    def test_skipped_pages_get_links_from_records(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post.html)")
+        manifest = new_manifest()
+        self.build(manifest)
+        home = os.path.join(self.docs, "index.html")
+        self.assertNotIn("links", manifest["pages"][home]["info"])
+        self.build(manifest)
+        source, info = self.pages[home]
+        self.assertEqual(info.title, "Home")
+        self.assertIsNone(info.links)
+        
+        records = {}
+        self.assertTrue(fill_links(self.pages, manifest["pages"], records))
+        self.assertEqual(info.links, [("link", "/blog/post.html", 3)])
+        self.assertEqual(records[home]["links"], [["link", "/blog/post.html", 3]])
+        # Unchanged sources are not parsed again.
+        records[home]["links"] = [["link", "/recorded/", 3]]
+        self.build(manifest)
+        self.assertFalse(fill_links(self.pages, manifest["pages"], records))
+        self.assertEqual(self.pages[home][1].links, [("link", "/recorded/", 3)])
+    
+    def test_parallel_build_matches_serial(self):
+        serial_log = self.build(None)
+        with open(os.path.join(self.docs, "blog", "post.html"), encoding="utf-8") as f:
+            serial = f.read()
+        os.remove(os.path.join(self.docs, "blog", "post.html"))
+        self.assertEqual(self.build(None, jobs=2), serial_log)
+        with open(os.path.join(self.docs, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), serial)
+    
+    def test_parallel_build_reports_first_error(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "no title")
+        self.write(os.path.join(self.content, "blog", "zzz.md"), "no title either")
+        with self.assertRaises(Exception) as ctx:
+            self.build(None, jobs=2)
+        self.assertIn("No h1 header", str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -1,5 +1,6 @@
+import io
 import unittest
-from markdown_blocks import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node, extract_title
+from markdown_blocks import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node, extract_title, iter_blocks, PageInfo
 
 class TestMarkdownToHTML(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -237,6 +238,14 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
     
+    def test_link_with_nested_emphasis(self):
+        md = "See [the **bold** guide](/guide) now"
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>See <a href="/guide">the <b>bold</b> guide</a> now</p></div>',
+        )
+    
     def test_h1(self):
         md = """
 # HI
@@ -313,4 +322,36 @@ no title
             )
             self.fail("Should have raised an exception")
         except Exception as e:
-            pass
\ No newline at end of file
+            pass
+    
+    def test_iter_blocks_untyped(self):
+        blocks = list(iter_blocks(["# Title", "", "```", "code", "```", "", "- item"], typed=False))
+        self.assertEqual([block.type for block in blocks], [None, BlockType.CODE, None])
+        self.assertEqual([block.lines for block in blocks], [["# Title"], ["```", "code", "```"], ["- item"]])
+    
+    def test_iter_blocks_line_ranges(self):
+        md = "# title\n\npara one\npara two\n\n\n- a\n- b\n"
+        blocks = list(iter_blocks(io.StringIO(md)))
+        self.assertEqual(
+            [(b.type, b.start, b.end) for b in blocks],
+            [
+                (BlockType.HEADING, 1, 1),
+                (BlockType.PARAGRAPH, 3, 4),
+                (BlockType.UNORDERED_LIST, 7, 8),
+            ],
+        )
+        self.assertEqual(blocks[1].lines, ["para one", "para two"])
+    
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "intro\n\n```python\nx = 1\n\n\ny = 2\n```\nafter"
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>intro</p><pre><code>x = 1\n\n\ny = 2\n</code></pre><p>after</p></div>",
+        )
+    
+    def test_title_from_file(self):
+        info = PageInfo()
+        node = markdown_to_html_node(io.StringIO("intro\n\n```\n# not a title\n```\n\n# Real title\n"), info)
+        self.assertEqual(info.title, "Real title")
+        self.assertIn("<h1>Real title</h1>", node.to_html())
\ No newline at end of file
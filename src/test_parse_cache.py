@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from markdown_blocks import parse_page
+from parse_cache import ParseCache
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "cache"))
+        self.source = os.path.join(self.tmp.name, "page.md")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# Title\n\nsome **text**")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_parse_page_round_trip(self):
+        node, info, meta = parse_page(self.source, self.cache)
+        with open(self.source, "rb") as f:
+            key = self.cache.key(f.read())
+        self.assertTrue(os.path.exists(self.cache.path(key)))
+        cached_node, cached_info, cached_meta = parse_page(self.source, self.cache)
+        self.assertIsNot(cached_node, node)
+        self.assertEqual(cached_node.to_html(), node.to_html())
+        self.assertEqual(cached_info.title, "Title")
+    
+    def test_corrupt_entry_is_a_miss(self):
+        key = self.cache.key(b"x")
+        os.makedirs(os.path.dirname(self.cache.path(key)))
+        with open(self.cache.path(key), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(self.cache.get(key))
+    
+    def test_prune_evicts_least_recently_used(self):
+        keys = [self.cache.key(str(i).encode()) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, "x" * 1000)
+            os.utime(self.cache.path(key), ns=(i * 10**9, i * 10**9))
+        self.cache.get(keys[0])
+        self.cache.max_bytes = os.path.getsize(self.cache.path(keys[0])) * 2
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertEqual(self.cache.get(keys[0]), "x" * 1000)
+        self.assertEqual(self.cache.get(keys[2]), "x" * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+import gzip
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from precompress import precompress
+from site_fixture import TempDirTestCase
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dst = self.root
+        self.write(os.path.join("blog", "index.html"), "<p>hello</p>" * 200)
+        self.write("index.css", "body {}")
+        self.write("image.png", "png" * 1000)
+    
+    def run_precompress(self, min_size=100):
+        with redirect_stdout(StringIO()):
+            return precompress(self.dst, min_size)
+    
+    def test_writes_variants_above_threshold(self):
+        totals = self.run_precompress()
+        self.assertEqual(totals["gzip"][0], 1)
+        self.assertLess(totals["gzip"][2], totals["gzip"][1])
+        with gzip.open(os.path.join(self.dst, "blog", "index.html.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "image.png.gz")))
+    
+    def test_skips_current_and_removes_orphans(self):
+        self.run_precompress()
+        self.assertEqual(self.run_precompress()["gzip"][0], 0)
+        
+        html = os.path.join(self.dst, "blog", "index.html")
+        st = os.stat(html + ".gz")
+        os.utime(html, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(self.run_precompress()["gzip"][0], 1)
+        
+        os.remove(html)
+        self.run_precompress()
+        self.assertFalse(os.path.exists(html + ".gz"))
+    
+    def test_excluded_files_are_skipped_and_lose_variants(self):
+        self.write("app.js", "let x = 1;" * 100)
+        self.write("app.js.gz", "stale")
+        with redirect_stdout(StringIO()):
+            totals = precompress(self.dst, 100, exclude=["app.js", "blog/index.html"])
+        self.assertEqual(totals["gzip"][0], 0)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "app.js.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "blog", "index.html.gz")))
+        self.assertEqual(self.run_precompress()["gzip"][0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
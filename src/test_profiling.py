@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+import unittest
+import profiling
+from markdown_blocks import markdown_to_html_node
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+    
+    def test_disabled_records_nothing(self):
+        self.assertFalse(profiling.enabled())
+        markdown_to_html_node("# title\n\nsome **text**").to_html()
+        self.assertEqual(profiling.disable(), [])
+    
+    def test_hooks_record_spans(self):
+        profiling.enable()
+        with profiling.span("generate_page", "page", {"path": "content/index.md"}):
+            markdown_to_html_node("# title\n\nsome **text**").to_html()
+        events = profiling.disable()
+        names = [event["name"] for event in events]
+        self.assertIn("markdown_to_html_node", names)
+        self.assertIn("text_to_textnodes", names)
+        self.assertIn("to_html", names)
+        self.assertEqual(names[-1], "generate_page")
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+        
+        summary = profiling.summarize(events)
+        self.assertIn("text_to_textnodes", summary)
+        self.assertIn("content/index.md", summary)
+    
+    def test_write_trace(self):
+        profiling.enable()
+        with profiling.span("stage"):
+            pass
+        events = profiling.disable()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out", "trace.json")
+            profiling.write_trace(path, events)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["traceEvents"][0]["name"], "stage")
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
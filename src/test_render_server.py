@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from render_server import RenderService, RenderSocketServer, serve_stream
+
+class TestRenderServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "page.html"), "w", encoding="utf-8") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css" />{{ Content }}')
+        self.service = RenderService(self.tmp.name)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def run_lines(self, *lines):
+        out = io.BytesIO()
+        serve_stream(self.service, io.BytesIO("".join(line + "\n" for line in lines).encode("utf-8")), out)
+        return [json.loads(line) for line in out.getvalue().decode("utf-8").splitlines()]
+    
+    def test_render_with_template(self):
+        request = {"id": "a", "markdown": "# Hi\n\n[x](/y)", "template": "page.html", "basepath": "/site/"}
+        [response] = self.run_lines(json.dumps(request))
+        self.assertEqual(response["id"], "a")
+        self.assertEqual(response["title"], "Hi")
+        self.assertEqual(
+            response["html"],
+            '<title>Hi</title><link href="/site/index.css" /><div><h1 id="hi">Hi</h1><p><a href="/site/y">x</a></p></div>',
+        )
+        self.assertGreaterEqual(response["ms"], 0)
+    
+    def test_front_matter(self):
+        with open(os.path.join(self.tmp.name, "post.html"), "w", encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title><time>{{ Page.date }}</time>{{ Content }}")
+        markdown = "---\ntitle: T\ndate: 2024-05-01\ntemplate: post.html\n---\n# Hi"
+        [response] = self.run_lines(json.dumps({"markdown": markdown, "template": "page.html"}))
+        self.assertEqual(response["title"], "T")
+        self.assertEqual(response["html"], '<title>T</title><time>2024-05-01</time><div><h1 id="hi">Hi</h1></div>')
+    
+    def test_batch_and_errors(self):
+        responses = self.run_lines(
+            json.dumps([{"id": 1, "markdown": "one"}, {"id": 2, "markdown": "x", "template": "../page.html"}]),
+            "",
+            "not json",
+            json.dumps({"id": 3}),
+        )
+        self.assertEqual([r["id"] for r in responses], [1, 2, None, 3])
+        self.assertEqual(responses[0]["html"], "<div><p>one</p></div>")
+        self.assertIn("outside", responses[1]["error"])
+        self.assertIn("invalid JSON", responses[2]["error"])
+        self.assertIn("markdown", responses[3]["error"])
+        self.assertEqual(self.service.count, 3)
+        self.assertIn("Rendered 3 request(s)", self.service.summary())
+    
+    def test_unix_socket(self):
+        path = os.path.join(self.tmp.name, "render.sock")
+        server = RenderSocketServer(path, self.service)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(b'{"id": 7, "markdown": "**b**", "minify": true}\n')
+            with client.makefile("rb") as f:
+                response = json.loads(f.readline())
+        self.assertEqual(response["html"], "<div><p><b>b</b></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
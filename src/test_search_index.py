@@ -0,0 +1,129 @@
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from fragment_cache import FragmentCache
+from manifest import new_manifest
+from parse_cache import ParseCache
+from markdown_blocks import PageInfo, generate_pages_recursive, markdown_to_html_node
+from search_index import SearchIndexer, decode_postings, encode_postings, shard_name
+from site_fixture import SiteTestCase, quietly
+
+class TestTerms(unittest.TestCase):
+    def test_text_only(self):
+        info = PageInfo()
+        markdown_to_html_node("# Hello **World**\n\nSee [the docs](/docs/x) and `code`.\n\n```\nhidden words\n```", info, terms=True)
+        self.assertEqual(info.terms, {"hello": 1, "world": 1, "see": 1, "the": 1, "docs": 1, "and": 1, "code": 1})
+    
+    def test_only_collected_on_request(self):
+        info = PageInfo()
+        markdown_to_html_node("# Hello\n\nWorld.", info)
+        self.assertIsNone(info.terms)
+    
+    def test_fragment_cache_hits_keep_terms(self):
+        fragments = FragmentCache()
+        for _ in range(2):
+            info = PageInfo()
+            markdown_to_html_node("Shared paragraph here.\n\nShared paragraph here.", info, fragments=fragments, terms=True)
+            self.assertEqual(info.terms, {"shared": 2, "paragraph": 2, "here": 2})
+        self.assertGreater(fragments.hits, 0)
+
+
+class TestPostings(unittest.TestCase):
+    def test_round_trip(self):
+        postings = [(0, 3), (4, 1), (5, 2), (90, 1)]
+        self.assertEqual(encode_postings(postings), [0, 3, 4, 1, 1, 2, 85, 1])
+        self.assertEqual(decode_postings(encode_postings(postings)), postings)
+    
+    def test_shard_name(self):
+        self.assertEqual(shard_name("hello"), "he")
+        self.assertEqual(shard_name("númenor"), "_6ec3ba")
+
+
+class TestSearchIndexer(SiteTestCase):
+    TEMPLATE = "{{ Content }}"
+    
+    def setUp(self):
+        super().setUp()
+        self.spill = os.path.join(self.root, "spill")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome home, hobbits.")
+        self.write(os.path.join(self.content, "shire.md"), "# Shire\n\nHobbits live in the Shire.")
+    
+    def build(self, manifest=None, memory_budget=1 << 20, cache=None):
+        with redirect_stdout(StringIO()):
+            state = manifest.get("search") if manifest is not None else None
+            indexer = SearchIndexer(self.docs, state, memory_budget, self.spill)
+            pages = generate_pages_recursive("/", self.content, self.template, self.docs, manifest, cache=cache, indexer=indexer)
+            indexer.backfill(pages, cache)
+            state = indexer.finish(pages)
+        if manifest is not None:
+            manifest["search"] = state
+        return indexer
+    
+    def lookup(self, term):
+        with open(os.path.join(self.docs, "search", "docs.json"), encoding="utf-8") as f:
+            table = json.load(f)
+        try:
+            with open(os.path.join(self.docs, "search", shard_name(term) + ".json"), encoding="utf-8") as f:
+                shard = json.load(f)
+        except FileNotFoundError:
+            return {}
+        return {table[doc][0]: count for doc, count in decode_postings(shard.get(term, []))}
+    
+    def read_index(self):
+        index = {}
+        for name in sorted(os.listdir(os.path.join(self.docs, "search"))):
+            with open(os.path.join(self.docs, "search", name), encoding="utf-8") as f:
+                index[name] = f.read()
+        return index
+    
+    def test_full_build(self):
+        self.build()
+        self.assertEqual(self.lookup("hobbits"), {"/": 1, "/shire.html": 1})
+        self.assertEqual(self.lookup("shire"), {"/shire.html": 2})
+        with open(os.path.join(self.docs, "search", "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        self.assertEqual(index["documents"], 2)
+        self.assertIn("ho", index["shards"])
+    
+    def test_spilling_gives_the_same_index(self):
+        self.build()
+        expected = self.read_index()
+        indexer = self.build(memory_budget=1)
+        self.assertEqual(indexer.spills, 2)
+        self.assertEqual(self.read_index(), expected)
+        self.assertFalse(os.path.exists(self.spill))
+    
+    def test_incremental(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.write(os.path.join(self.content, "shire.md"), "# Shire\n\nBaggins lives in Bag End.")
+        indexer = self.build(manifest)
+        self.assertEqual(indexer.indexed, 1)
+        self.assertEqual(self.lookup("hobbits"), {"/": 1})
+        self.assertEqual(self.lookup("baggins"), {"/shire.html": 1})
+        
+        os.remove(os.path.join(self.content, "shire.md"))
+        indexer = self.build(manifest)
+        self.assertEqual((indexer.indexed, indexer.removed), (0, 1))
+        self.assertEqual(self.lookup("baggins"), {})
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "ba.json")))
+    
+    def test_backfill_pages_skipped_before_indexing(self):
+        manifest = new_manifest()
+        quietly(generate_pages_recursive, "/", self.content, self.template, self.docs, manifest)
+        indexer = self.build(manifest)
+        self.assertEqual(indexer.indexed, 2)
+        self.assertEqual(self.lookup("hobbits"), {"/": 1, "/shire.html": 1})
+    
+    def test_parse_cache_from_a_build_without_the_index(self):
+        cache = ParseCache(os.path.join(self.root, "cache"))
+        pages = quietly(generate_pages_recursive, "/", self.content, self.template, self.docs, cache=cache)
+        self.assertIsNone(pages[os.path.join(self.docs, "index.html")][1].terms)
+        self.build(cache=cache)
+        self.assertEqual(self.lookup("hobbits"), {"/": 1, "/shire.html": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from functools import partial
+from http.server import ThreadingHTTPServer
+from server import BuildState, DevRequestHandler, LIVE_RELOAD_SCRIPT, snapshot
+
+class QuietHandler(DevRequestHandler):
+    def log_message(self, *args):
+        pass
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        with open(os.path.join(self.root, "index.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body><p>hi</p></body></html>")
+        with open(os.path.join(self.root, "index.css"), "w", encoding="utf-8") as f:
+            f.write("body {}")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def start(self, live_reload):
+        handler = partial(QuietHandler, directory=self.root, state=BuildState(), live_reload=live_reload)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(httpd.shutdown)
+        return f"http://127.0.0.1:{httpd.server_address[1]}"
+    
+    def fetch(self, url):
+        with urllib.request.urlopen(url) as response:
+            return response.read().decode("utf-8")
+    
+    def test_snapshot_sees_changes(self):
+        before = snapshot([self.root])
+        with open(os.path.join(self.root, "new.md"), "w", encoding="utf-8") as f:
+            f.write("# new")
+        after = snapshot([self.root])
+        self.assertNotEqual(before, after)
+        self.assertIn(os.path.join(self.root, "new.md"), after)
+    
+    def test_live_reload_script_injected(self):
+        base = self.start(True)
+        page = self.fetch(base + "/")
+        self.assertIn(LIVE_RELOAD_SCRIPT + "</body>", page)
+        self.assertEqual(self.fetch(base + "/index.css"), "body {}")
+    
+    def test_directory_without_slash_redirects(self):
+        os.mkdir(os.path.join(self.root, "contact"))
+        with open(os.path.join(self.root, "contact", "index.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body>contact</body></html>")
+        base = self.start(True)
+        with urllib.request.urlopen(base + "/contact?x=1") as response:
+            self.assertEqual(response.url, base + "/contact/?x=1")
+            self.assertIn(LIVE_RELOAD_SCRIPT, response.read().decode("utf-8"))
+    
+    def test_plain_serving(self):
+        base = self.start(False)
+        self.assertNotIn("EventSource", self.fetch(base + "/"))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
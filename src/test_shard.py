@@ -0,0 +1,89 @@
+import json
+import os
+import unittest
+from fingerprint import DEPLOY_MANIFEST_PATH
+from main import merge_site, parse_merge_args
+from manifest import MANIFEST_PATH, load_manifest, new_manifest, save_manifest
+from markdown_blocks import generate_pages_recursive
+from search_index import SEARCH_DIR
+from shard import MergeError, merge_shards, parse_shard, select_shard, shard_of
+from site_fixture import SiteTestCase, quietly
+
+class TestShardSelection(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ("0/4", "5/4", "1", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+    
+    def test_stable_partition(self):
+        pages = [(os.path.join("content", f"p{n}.md"), f"docs/p{n}.html") for n in range(200)]
+        shards = [select_shard(pages, (index, 4), "content") for index in range(1, 5)]
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(pages))
+        self.assertTrue(all(shard for shard in shards))
+        self.assertEqual(shard_of("blog/post.md", 4), shard_of(os.path.join("blog", "post.md"), 4))
+
+
+class TestMergeShards(SiteTestCase):
+    TEMPLATE = "{{ Content }}"
+    
+    def setUp(self):
+        super().setUp()
+        for n in range(6):
+            self.write(os.path.join(self.content, f"p{n}.md"), f"# Page {n}")
+        self.shard_dirs = [os.path.join(self.root, f"node{index}") for index in (1, 2)]
+        for index, shard_dir in enumerate(self.shard_dirs, start=1):
+            manifest = new_manifest()
+            manifest["shard"] = [index, 2]
+            quietly(generate_pages_recursive, "/", self.content, self.template, os.path.join(shard_dir, "docs"), manifest, shard=(index, 2))
+            save_manifest(os.path.join(shard_dir, "manifest.json"), manifest)
+        self.dest = self.docs
+    
+    def merge(self, shard_dirs):
+        return quietly(merge_shards, shard_dirs, self.dest, "docs", "manifest.json")
+    
+    def test_merge(self):
+        manifest = self.merge(self.shard_dirs)
+        self.assertEqual(sorted(os.listdir(self.dest)), [f"p{n}.html" for n in range(6)])
+        self.assertEqual(len(manifest["pages"]), 6)
+        self.assertNotIn("shard", manifest)
+    
+    def test_duplicate_output_fails(self):
+        # p0.html comes from one shard; make the other produce it as well.
+        for shard_dir in self.shard_dirs:
+            with open(os.path.join(shard_dir, "docs", "p0.html"), "a") as f:
+                f.write("")
+        with self.assertRaises(MergeError) as e:
+            self.merge(self.shard_dirs)
+        self.assertIn("p0.html", str(e.exception))
+        self.assertFalse(os.path.exists(self.dest))
+    
+    def test_missing_shard_fails(self):
+        with self.assertRaises(MergeError):
+            self.merge(self.shard_dirs[:1])
+    
+    def merge_site(self, *flags):
+        # The merge command works on the site in the current directory.
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        for shard_dir in self.shard_dirs:
+            os.makedirs(os.path.join(shard_dir, os.path.dirname(MANIFEST_PATH)))
+            os.replace(os.path.join(shard_dir, "manifest.json"), os.path.join(shard_dir, MANIFEST_PATH))
+        quietly(merge_site, parse_merge_args(["node1", "node2", *flags]))
+    
+    def test_merge_with_search_index(self):
+        self.merge_site("--search-index")
+        with open(os.path.join(self.dest, SEARCH_DIR, "index.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["documents"], 6)
+        self.assertEqual(len(load_manifest(os.path.join(self.root, MANIFEST_PATH))["search"]["docs"]), 6)
+    
+    def test_merge_with_deploy_manifest(self):
+        self.merge_site("--deploy-manifest")
+        with open(os.path.join(self.root, DEPLOY_MANIFEST_PATH), encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        self.assertEqual(sorted(files), [f"p{n}.html" for n in range(6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
+from io import StringIO
+from manifest import new_manifest
+from markdown_blocks import PageInfo, generate_pages_recursive, markdown_to_html_node
+from site_fixture import SiteTestCase
+from site_index import write_site_index
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+class TestSummary(unittest.TestCase):
+    def test_first_real_paragraph(self):
+        info = PageInfo()
+        markdown_to_html_node("# T\n\n[< Back](/)\n\n![img](/a.png)\n\nFirst **real**\nparagraph.\n\nSecond.", info)
+        self.assertEqual(info.summary, "First real paragraph.")
+    
+    def test_truncated(self):
+        info = PageInfo()
+        markdown_to_html_node("word " * 100, info)
+        self.assertTrue(info.summary.endswith("…"))
+        self.assertLessEqual(len(info.summary), 281)
+
+
+class TestSiteIndex(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# My Site\n\nWelcome.")
+        for n in range(1, 4):
+            self.write(
+                os.path.join(self.content, "blog", f"post{n}.md"),
+                f"---\ndate: 2024-01-0{n}\ntags: [t{n}]\n---\n# Post {n} & more\n\nSummary {n}.",
+            )
+    
+    def build(self, manifest=None, per_page=2):
+        with redirect_stdout(StringIO()):
+            pages = generate_pages_recursive("/site/", self.content, self.template, self.docs, manifest)
+            return write_site_index(
+                pages, self.docs, "/site/", self.template, "https://example.com", "blog", per_page, manifest
+            )
+    
+    def test_listing_pages(self):
+        written = self.build()
+        self.assertEqual(sorted(written), [
+            os.path.join(self.docs, "blog", "index.html"),
+            os.path.join(self.docs, "blog", "page", "2", "index.html"),
+        ])
+        first = self.read("blog", "index.html")
+        self.assertLess(first.index("Post 3 &amp; more"), first.index("Post 2 &amp; more"))
+        self.assertIn('<a href="/site/blog/post3.html">', first)
+        self.assertIn("<p>Summary 3.</p>", first)
+        self.assertIn('<a href="/site/blog/page/2/" rel="next">', first)
+        self.assertIn("Post 1", self.read("blog", "page", "2", "index.html"))
+    
+    def test_sitemap_and_feed(self):
+        self.build()
+        sitemap = ET.fromstring(self.read("sitemap.xml"))
+        locs = [url[0].text for url in sitemap]
+        self.assertIn("https://example.com/site/", locs)
+        self.assertIn("https://example.com/site/blog/page/2/", locs)
+        self.assertIn("https://example.com/site/blog/post1.html", locs)
+        
+        feed = ET.fromstring(self.read("feed.xml"))
+        self.assertEqual(feed.find(f"{ATOM}title").text, "My Site")
+        self.assertEqual(feed.find(f"{ATOM}updated").text, "2024-01-03T00:00:00Z")
+        entries = feed.findall(f"{ATOM}entry")
+        self.assertEqual([entry.find(f"{ATOM}title").text for entry in entries], ["Post 3 & more", "Post 2 & more", "Post 1 & more"])
+        self.assertEqual(entries[0].find(f"{ATOM}summary").text, "Summary 3.")
+        self.assertEqual(entries[0].find(f"{ATOM}category").get("term"), "t3")
+    
+    def test_incremental_removes_stale_listing(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.build(manifest, per_page=10)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "page", "2", "index.html")))
+        self.assertEqual(list(manifest["listings"]), [os.path.join(self.docs, "blog", "index.html")])
+    
+    def test_unchanged_listings_are_not_rerendered(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        # A listing that would be rewritten if it were rendered again.
+        self.write(os.path.join(self.docs, "blog", "index.html"), "untouched")
+        written = self.build(manifest)
+        self.assertEqual(self.read("blog", "index.html"), "untouched")
+        self.assertEqual(written[os.path.join(self.docs, "blog", "index.html")][1].title, "Blog")
+        self.write(os.path.join(self.content, "blog", "post3.md"), "---\ndate: 2024-01-03\n---\n# Renamed post")
+        self.build(manifest)
+        self.assertIn("Renamed post", self.read("blog", "index.html"))
+    
+    def test_only_changed_listing_pages_are_rerendered(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.write(os.path.join(self.docs, "blog", "page", "2", "index.html"), "untouched")
+        self.write(os.path.join(self.content, "blog", "post3.md"), "---\ndate: 2024-01-03\n---\n# Renamed post")
+        self.build(manifest)
+        self.assertIn("Renamed post", self.read("blog", "index.html"))
+        self.assertEqual(self.read("blog", "page", "2", "index.html"), "untouched")
+    
+    def test_listing_replaced_by_page_is_kept(self):
+        manifest = new_manifest()
+        self.build(manifest)
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Hand-written blog index")
+        written = self.build(manifest)
+        self.assertNotIn(os.path.join(self.docs, "blog", "index.html"), written)
+        self.assertIn("Hand-written blog index", self.read("blog", "index.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "page", "2", "index.html")))
+        self.assertEqual(manifest["listings"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -204,4 +204,30 @@ class TestSplitDelimiter(unittest.TestCase):
                 TextNode("link", TextType.LINK, "https://boot.dev"),
             ], 
             text_to_textnodes(text)
-        )
\ No newline at end of file
+        )
+    
+    def test_split_leftmost_wins(self):
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("snake_case", TextType.CODE),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "https://example.com/a_b"),
+            ],
+            text_to_textnodes("see `snake_case` and [docs](https://example.com/a_b)"),
+        )
+    
+    def test_split_link_keeps_nested_markup(self):
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("**bold** link", TextType.LINK, "/x"),
+                TextNode(" and [not a link", TextType.TEXT),
+            ],
+            text_to_textnodes("a [**bold** link](/x) and [not a link"),
+        )
+    
+    def test_split_unmatched(self):
+        with self.assertRaises(Exception) as ctx:
+            text_to_textnodes("this **never closes")
+        self.assertIn("Invalid markdown, unmatched delimiter", str(ctx.exception))
\ No newline at end of file
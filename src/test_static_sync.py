@@ -0,0 +1,69 @@
+import os
+import unittest
+from discovery import scan_tree
+from manifest import new_manifest
+from site_fixture import TempDirTestCase, quietly
+from static_sync import clear_output, list_files, sync_static
+
+class TestStaticSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dst = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+        self.write(os.path.join(self.src, "images", "a.png:Zone.Identifier"), "junk")
+        self.write(os.path.join(self.src, ".hidden"), "secret")
+    
+    def sync(self, manifest, link=False):
+        return quietly(sync_static, self.src, self.dst, manifest, link)
+    
+    def test_copies_then_skips(self):
+        manifest = new_manifest()
+        self.assertEqual(self.sync(manifest)["copied"], 2)
+        self.assertEqual(sorted(manifest["assets"]), ["images/a.png", "index.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.dst, ".hidden")))
+        src_mtime = os.stat(os.path.join(self.src, "index.css")).st_mtime_ns
+        self.assertEqual(os.stat(os.path.join(self.dst, "index.css")).st_mtime_ns, src_mtime)
+        self.assertEqual(self.sync(manifest)["unchanged"], 2)
+    
+    def test_changed_and_orphaned(self):
+        manifest = new_manifest()
+        self.sync(manifest)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red; }")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        counts = self.sync(manifest)
+        self.assertEqual((counts["copied"], counts["removed"]), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images", "a.png")))
+        with open(os.path.join(self.dst, "index.css"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "body { color: red; }")
+    
+    def test_touched_but_identical(self):
+        manifest = new_manifest()
+        self.sync(manifest)
+        os.utime(os.path.join(self.src, "index.css"), ns=(0, 10**9))
+        self.assertEqual(self.sync(manifest)["copied"], 0)
+        self.assertEqual(os.stat(os.path.join(self.dst, "index.css")).st_mtime_ns, 10**9)
+    
+    def test_link(self):
+        self.assertEqual(self.sync(None, link=True)["linked"], 2)
+        self.assertTrue(os.path.samefile(os.path.join(self.src, "index.css"), os.path.join(self.dst, "index.css")))
+    
+    def test_reuses_the_callers_scan(self):
+        entries = [entry for entry in scan_tree(self.src) if entry.rel == "index.css"]
+        counts = quietly(sync_static, self.src, self.dst, None, entries=entries)
+        self.assertEqual(counts["copied"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images", "a.png")))
+    
+    def test_clear_output_keeps_static_copies(self):
+        self.sync(None)
+        os.makedirs(os.path.join(self.dst, "blog"))
+        self.write(os.path.join(self.dst, "blog", "index.html"), "page")
+        self.write(os.path.join(self.dst, "index.css.gz"), "variant")
+        clear_output(self.dst, list_files(self.src))
+        self.assertEqual(sorted(os.listdir(self.dst)), ["images", "index.css"])
+        self.assertEqual(self.sync(None)["unchanged"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
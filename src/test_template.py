@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+import unittest
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template
+
+class TestTemplate(unittest.TestCase):
+    def test_slots(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        content = ParentNode("p", [LeafNode("b", "hi")])
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": content}),
+            "<title>Home</title><article><p><b>hi</b></p></article>",
+        )
+    
+    def test_basepath_only_touches_markup(self):
+        template = Template('<link href="/index.css" />{{ Content }}', basepath="/site/")
+        content = ParentNode("p", [
+            LeafNode("a", "home", {"href": "/"}),
+            LeafNode("code", 'href="/raw"'),
+        ])
+        self.assertEqual(
+            template.render({"Content": content}),
+            '<link href="/site/index.css" /><p><a href="/site/">home</a><code>href="/raw"</code></p>',
+        )
+    
+    def test_minify(self):
+        source = (
+            "<!doctype html>\n<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n"
+            "  <!-- comment -->\n  <body>\n    <pre>\n  raw   text\n</pre>\n"
+            "    <p>some   <b>bold</b> text</p>\n    <article>{{ Content }}</article>\n  </body>\n</html>\n"
+        )
+        content = ParentNode("div", [ParentNode("p", [LeafNode(None, "a  b")])])
+        self.assertEqual(
+            Template(source, minify=True).render({"Title": "Home", "Content": content}),
+            "<!doctype html><html><head><title>Home</title><body><pre>\n  raw   text\n</pre>"
+            "<p>some <b>bold</b> text</p><article><div><p>a b</div></article>",
+        )
+    
+    def test_loops_and_conditionals(self):
+        template = Template(
+            "{% for post in posts %}{% if post.draft %}[draft]{% else %}{{ post.title }};{% endif %}{% endfor %}"
+            "{% if not posts %}none{% endif %}"
+        )
+        posts = [{"title": "a", "draft": False}, {"title": "b", "draft": True}]
+        self.assertEqual(template.render({"posts": posts}), "a;[draft]")
+        self.assertEqual(template.render({"posts": []}), "none")
+    
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Template("{% for x in xs %}")
+        with self.assertRaises(ValueError):
+            Template("{% endif %}")
+        with self.assertRaises(ValueError):
+            Template("{{ Missing }}").render({})
+    
+    def test_missing_dict_keys(self):
+        self.assertEqual(Template("{% if Page.tags %}x{% else %}none{% endif %}").render({"Page": {}}), "none")
+        self.assertEqual(Template("{% for t in Page.tags %}{{ t }}{% endfor %}").render({"Page": {}}), "")
+        with self.assertRaisesRegex(ValueError, "undefined template variable Page.date"):
+            Template("{{ Page.date }}").render({"Page": {}})
+    
+    def test_include_and_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.html")
+            with open(os.path.join(tmp, "footer.html"), "w", encoding="utf-8") as f:
+                f.write("<footer>{{ Title }}</footer>")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('<main>{{ Title }}</main>{% include "footer.html" %}')
+            template = load_template(path)
+            self.assertEqual(template.render({"Title": "x"}), "<main>x</main><footer>x</footer>")
+            self.assertIs(load_template(path), template)
+            
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<div>{{ Title }}</div>")
+            future = time.time_ns() + 10**9
+            os.utime(path, ns=(future, future))
+            self.assertEqual(load_template(path).render({"Title": "y"}), "<div>y</div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
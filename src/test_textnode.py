@@ -53,7 +53,12 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         html_node = text_node_to_html_node(node)
         self.assertEqual(html_node.tag, "b")
         self.assertEqual(html_node.value, "This is bold")
-
+    
+    def test_compact_nodes(self):
+        node = text_node_to_html_node(TextNode("bold", TextType.BOLD))
+        self.assertFalse(hasattr(TextNode("x", TextType.TEXT), "__dict__"))
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node.to_html(), "<b>bold</b>")
 
 
 if __name__ == "__main__":
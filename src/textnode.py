@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = "image" #![str](url)
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+    
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -27,17 +29,18 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
+_SIMPLE_TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
 def text_node_to_html_node(text_node):
     typ = text_node.text_type
     tex = text_node.text
-    if typ == TextType.TEXT:
-        return LeafNode(None, tex)
-    elif typ == TextType.BOLD:
-        return LeafNode("b", tex)
-    elif typ == TextType.ITALIC:
-        return LeafNode("i", tex)
-    elif typ == TextType.CODE:
-        return LeafNode("code", tex)
+    if typ in _SIMPLE_TAGS:
+        return LeafNode(_SIMPLE_TAGS[typ], tex)
     elif typ == TextType.LINK:
         return LeafNode("a", tex, {"href": text_node.url})
     elif typ == TextType.IMAGE: